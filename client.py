@@ -3,22 +3,355 @@
 KVM Client (Laptop B) - Empfängt Events und simuliert sie lokal
 """
 import asyncio
+from collections import deque
 import websockets
 import json
 import pyautogui
+import struct
+import sys
+from types import MappingProxyType
+import threading
+from concurrent.futures import ThreadPoolExecutor
 # Optional macOS fast path for cursor movement
 try:
     import Quartz
     _HAS_QUARTZ = True
 except Exception:
     _HAS_QUARTZ = False
+# Optional C JSON decoder (orjson.JSONDecodeError subclasses json.JSONDecodeError)
+try:
+    import orjson
+    _loads = orjson.loads
+except Exception:
+    _loads = json.loads
+# Optionaler Decoder für binäre msgpack-Frames (Server mit --wire msgpack)
+try:
+    import msgpack
+    _unpackb = msgpack.unpackb
+except Exception:
+    _unpackb = None
+# Optionaler libuv-Eventloop (nur POSIX, deutlich weniger Overhead pro recv)
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except Exception:
+    _new_event_loop = None
 from pynput.keyboard import Key, Listener as KeyboardListener
 from pynput import keyboard
 
+# Binäre Move-Frames vom Server (--wire binary), müssen zu server.py passen:
+# 'N' normalisiert (x, y als 16-Bit-Festkomma 0..65535, src_w, src_h), 'M' Pixel (x, y int16)
+_MOVE_TAG = ord('N')
+_MOVE_FRAME = struct.Struct('<cHHHH')
+_Q16 = 1.0 / 65535
+_MOVE_FRAME_SIZE = _MOVE_FRAME.size
+_PIXEL_TAG = ord('M')
+_PIXEL_FRAME = struct.Struct('<chh')
+_PIXEL_FRAME_SIZE = _PIXEL_FRAME.size
+# 'S' Bildschirmgröße des Servers (w, h uint16), 'P' Pixel auf diesem Bildschirm (x, y uint16)
+_SCREEN_TAG = ord('S')
+_SRC_TAG = ord('P')
+_SIZE_FRAME = struct.Struct('<cHH')
+# Frames, die websockets vorpuffern darf (der Reader dünnt Moves anschließend aus)
+RECV_QUEUE = 32
+# Intervall, in dem die Bildschirmgröße neu eingelesen wird (Auflösungswechsel)
+SCREEN_REFRESH_S = 2.0
+
+# Einmalig aufgebaute Lookup-Tabellen (nicht pro Event neu anlegen)
+_BUTTON_MAP = {
+    'left': 'left',
+    'right': 'right',
+    'middle': 'middle',
+}
+
+# Alle pynput-Sondertasten ('Key.f5', 'Key.caps_lock', ...) einmalig beim Import,
+# passend zu str(key) auf der Server-Seite; read-only, da modulweit geteilt
+_SPECIAL_KEYS = MappingProxyType({f'Key.{name}': key for name, key in Key.__members__.items()})
+
+# Ganzzahlige Tastencodes (--wire msgpack/binary), müssen zu _KEY_NAMES in server.py
+# passen: Sondertasten als ~Index in diese Liste, Zeichen als Codepoint.
+# Nur am Ende erweitern, sonst verschieben sich die Codes.
+_KEY_NAMES = (
+    'alt', 'alt_l', 'alt_r', 'alt_gr', 'backspace', 'caps_lock', 'cmd', 'cmd_l',
+    'cmd_r', 'ctrl', 'ctrl_l', 'ctrl_r', 'delete', 'down', 'end', 'enter', 'esc',
+    'home', 'left', 'page_down', 'page_up', 'right', 'shift', 'shift_l', 'shift_r',
+    'space', 'tab', 'up', 'insert', 'menu', 'num_lock', 'pause', 'print_screen',
+    'scroll_lock', 'media_play_pause', 'media_volume_mute', 'media_volume_down',
+    'media_volume_up', 'media_previous', 'media_next', 'f1', 'f2', 'f3', 'f4', 'f5',
+    'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12', 'f13', 'f14', 'f15', 'f16', 'f17',
+    'f18', 'f19', 'f20',
+)
+_KEY_TABLE = tuple(getattr(Key, name, None) for name in _KEY_NAMES)
+
+# Zahlentypen, die json/msgpack für Koordinaten liefern
+_NUMBER = (int, float)
+
+
+def _clamp01(v):
+    """Auf [0, 1] begrenzen (ohne max/min-Aufrufe, NaN -> 0)"""
+    return 0.0 if not v >= 0.0 else (1.0 if v > 1.0 else v)
+
+
+def _negotiated_extensions(websocket):
+    """Sec-WebSocket-Extensions der Server-Antwort (alte und neue websockets-API)"""
+    headers = getattr(websocket, 'response_headers', None)
+    if headers is None:
+        headers = getattr(getattr(websocket, 'response', None), 'headers', None)
+    if headers is None:
+        return ''
+    return headers.get('Sec-WebSocket-Extensions', '') or ''
+
+
+def _ease_step(delta, max_step):
+    """Easing-Schritt: 40% der Reststrecke, mind. 1px, max. max_step"""
+    step = int(abs(delta) * 0.4)
+    if step < 1:
+        step = 1
+    elif step > max_step:
+        step = max_step
+    return step if delta > 0 else -step
+
+
+class _PyAutoGuiBackend:
+    """Fallback: Maus über pyautogui steuern"""
+    name = 'pyautogui'
+    # X11-Roundtrips (pyautogui synct nach jedem Call) können den Eventloop
+    # blockieren -> in Worker-Thread auslagern
+    blocking = sys.platform.startswith('linux')
+
+    @staticmethod
+    def position():
+        return pyautogui.position()
+
+    @staticmethod
+    def move_to(x, y):
+        pyautogui.moveTo(x, y, duration=0)
+
+    @staticmethod
+    def move_rel(dx, dy):
+        pyautogui.moveRel(dx, dy, duration=0)
+
+    @staticmethod
+    def button(button, pressed):
+        if pressed:
+            pyautogui.mouseDown(button=button)
+        else:
+            pyautogui.mouseUp(button=button)
+
+    @staticmethod
+    def scroll(clicks):
+        pyautogui.scroll(clicks)
+
+
+class _QuartzBackend:
+    """macOS: CGEvents direkt posten (ohne pyautogui-Overhead und ohne CGWarp)"""
+    name = 'quartz'
+    blocking = False
+
+    def __init__(self):
+        Q = Quartz
+        self._post = Q.CGEventPost
+        self._create = Q.CGEventCreateMouseEvent
+        self._set_loc = Q.CGEventSetLocation
+        self._tap = Q.kCGHIDEventTap
+        self._src = Q.CGEventSourceCreate(Q.kCGEventSourceStateHIDSystemState)
+        # button -> (CGMouseButton, Down, Up, Dragged)
+        self._types = {
+            'left': (Q.kCGMouseButtonLeft, Q.kCGEventLeftMouseDown,
+                     Q.kCGEventLeftMouseUp, Q.kCGEventLeftMouseDragged),
+            'right': (Q.kCGMouseButtonRight, Q.kCGEventRightMouseDown,
+                      Q.kCGEventRightMouseUp, Q.kCGEventRightMouseDragged),
+            'middle': (Q.kCGMouseButtonCenter, Q.kCGEventOtherMouseDown,
+                       Q.kCGEventOtherMouseUp, Q.kCGEventOtherMouseDragged),
+        }
+        # Klick-Events einmalig anlegen, pro Klick nur die Position setzen
+        self._click_events = {}
+        for name, (btn, down, up, _drag) in self._types.items():
+            self._click_events[(name, True)] = self._create(self._src, down, (0, 0), btn)
+            self._click_events[(name, False)] = self._create(self._src, up, (0, 0), btn)
+        self._moved = Q.kCGEventMouseMoved
+        self._held = None  # gedrückte Taste -> Dragged-Events statt Moved
+        self._scroll_unit = Q.kCGScrollEventUnitLine
+        self._scroll_create = Q.CGEventCreateScrollWheelEvent
+        self._get_loc = Q.CGEventGetLocation
+        self._create_event = Q.CGEventCreate
+
+    def position(self):
+        p = self._get_loc(self._create_event(None))
+        return int(p.x), int(p.y)
+
+    def move_to(self, x, y):
+        held = self._held
+        if held is None:
+            ev = self._create(self._src, self._moved, (x, y), 0)
+        else:
+            btn, _down, _up, drag = self._types[held]
+            ev = self._create(self._src, drag, (x, y), btn)
+        self._post(self._tap, ev)
+
+    def move_rel(self, dx, dy):
+        x, y = self.position()
+        self.move_to(x + dx, y + dy)
+
+    def button(self, button, pressed):
+        ev = self._click_events[(button, pressed)]
+        self._set_loc(ev, self._get_loc(self._create_event(None)))
+        self._post(self._tap, ev)
+        if pressed:
+            self._held = button
+        elif self._held == button:
+            self._held = None
+
+    def scroll(self, clicks):
+        self._post(self._tap, self._scroll_create(self._src, self._scroll_unit, 1, int(clicks)))
+
+
+class _Win32Backend:
+    """Windows: SetCursorPos/SendInput direkt über ctypes"""
+    name = 'win32'
+    blocking = False
+
+    _MOUSEEVENTF_WHEEL = 0x0800
+    _BUTTON_FLAGS = {
+        ('left', True): 0x0002, ('left', False): 0x0004,
+        ('right', True): 0x0008, ('right', False): 0x0010,
+        ('middle', True): 0x0020, ('middle', False): 0x0040,
+    }
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG),
+                        ('mouseData', wintypes.DWORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [('mi', MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('u', _INPUTUNION)]
+
+        user32 = ctypes.windll.user32
+        self._send_input = user32.SendInput
+        self._get_cursor = user32.GetCursorPos
+        self.move_to = user32.SetCursorPos
+        # Ein INPUT-Struct wiederverwenden statt pro Event neu anzulegen
+        self._inp = INPUT(type=0)  # INPUT_MOUSE
+        self._mi = self._inp.u.mi
+        self._inp_ref = ctypes.byref(self._inp)
+        self._inp_size = ctypes.sizeof(INPUT)
+        self._pt = wintypes.POINT()
+        self._pt_ref = ctypes.byref(self._pt)
+
+    def position(self):
+        self._get_cursor(self._pt_ref)
+        return self._pt.x, self._pt.y
+
+    def move_rel(self, dx, dy):
+        # Wie pyautogui: absolut setzen, damit die Zeigerbeschleunigung nicht greift
+        x, y = self.position()
+        self.move_to(x + dx, y + dy)
+
+    def _send(self, flags, data=0):
+        mi = self._mi
+        mi.dwFlags = flags
+        mi.mouseData = data & 0xFFFFFFFF
+        self._send_input(1, self._inp_ref, self._inp_size)
+
+    def button(self, button, pressed):
+        self._send(self._BUTTON_FLAGS[(button, pressed)])
+
+    def scroll(self, clicks):
+        self._send(self._MOUSEEVENTF_WHEEL, int(clicks))
+
+
+class _XTestBackend:
+    """Linux/X11: XTest-Events direkt über python-xlib (kommt mit pynput)"""
+    name = 'xtest'
+    # XTest-Requests sind one-way und werden nur geflusht, kein Roundtrip pro Move
+    blocking = False
+
+    _BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+
+    def __init__(self):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self._disp = display.Display()
+        if not self._disp.has_extension('XTEST'):
+            raise RuntimeError('XTEST-Erweiterung fehlt')
+        self._root = self._disp.screen().root
+        self._fake = xtest.fake_input
+        self._flush = self._disp.flush
+        self._motion = X.MotionNotify
+        self._press = X.ButtonPress
+        self._release = X.ButtonRelease
+
+    def position(self):
+        p = self._root.query_pointer()
+        return p.root_x, p.root_y
+
+    def move_to(self, x, y):
+        self._fake(self._disp, self._motion, x=int(x), y=int(y))
+        self._flush()
+
+    def move_rel(self, dx, dy):
+        # Wie pyautogui absolut setzen (keine Zeigerbeschleunigung)
+        x, y = self.position()
+        self.move_to(x + dx, y + dy)
+
+    def button(self, button, pressed):
+        self._fake(self._disp, self._press if pressed else self._release, self._BUTTONS[button])
+        self._flush()
+
+    def scroll(self, clicks):
+        # X11-Scrollen = Klicks auf Taste 4 (hoch) bzw. 5 (runter)
+        btn = 4 if clicks > 0 else 5
+        for _ in range(abs(int(clicks))):
+            self._fake(self._disp, self._press, btn)
+            self._fake(self._disp, self._release, btn)
+        self._flush()
+
+
+def _make_backend():
+    """Schnellstes verfügbares Maus-Backend wählen, sonst pyautogui"""
+    try:
+        if _HAS_QUARTZ:
+            return _QuartzBackend()
+        if sys.platform == 'win32':
+            return _Win32Backend()
+        if sys.platform.startswith('linux'):
+            return _XTestBackend()
+    except Exception as e:
+        print(f"Natives Maus-Backend nicht verfügbar, nutze pyautogui: {e}")
+    return _PyAutoGuiBackend()
+
+
+def _raise_thread_priority():
+    """Aktuellen Thread für geringe Eingabe-Latenz bevorzugen (nicht den ganzen Prozess,
+    der Client läuft auch im GUI-Prozess von qt_app.py).
+    Ohne Rechte (z.B. SCHED_FIFO ohne CAP_SYS_NICE) bleibt es bei der Normalpriorität."""
+    try:
+        import ctypes
+        if sys.platform == 'darwin':
+            libc = ctypes.CDLL('/usr/lib/libSystem.dylib')
+            libc.pthread_set_qos_class_self_np(0x21, 0)  # QOS_CLASS_USER_INTERACTIVE
+        elif sys.platform == 'win32':
+            k32 = ctypes.windll.kernel32
+            k32.SetThreadPriority(k32.GetCurrentThread(), 15)  # THREAD_PRIORITY_TIME_CRITICAL
+        else:
+            import os
+            # pid 0 = aufrufender Thread unter Linux
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(20))
+    except Exception as e:
+        print(f"Erhöhte Priorität nicht möglich: {e}")
+
+
 class KVMClient:
     def __init__(self, server_host='localhost', server_port=8765, map_mode='normalized',
                  interp_enabled=False, interp_rate_hz=240, interp_step_px=10, deadzone_px=1,
-                 speed=1.0):
+                 speed=1.0, ping_timeout=10.0, offload_input=None, realtime=False):
         self.server_host = server_host
         self.server_port = server_port
         self.uri = f"ws://{server_host}:{server_port}"
@@ -29,6 +362,8 @@ class KVMClient:
         self.interp_step_px = max(1, int(interp_step_px))
         self.deadzone_px = max(0, int(deadzone_px))
         self.speed = max(0.1, float(speed))
+        # Keepalive: 0 deaktiviert Pings, sonst Timeout in Sekunden bis zum Abbruch
+        self.ping_timeout = max(0.0, float(ping_timeout))
         
         # PyAutoGUI Einstellungen für maximale Performance
         pyautogui.FAILSAFE = False  # Deaktiviert Fail-Safe
@@ -51,28 +386,97 @@ class KVMClient:
         self._pending_dx = 0
         self._pending_dy = 0
         self._smoother_task = None
+        # Weckt den Smoother nur bei neuer Arbeit (statt Polling mit interp_rate_hz)
+        self._work_ev = asyncio.Event()
+        # Vorberechnete preserve-Parameter: (src_w, src_h, x_off, y_off, sx, sy),
+        # wird bei Änderung der Bildschirmgröße verworfen
+        self._preserve_params = None
+        # Bildschirmgröße des Servers aus dem 'S'-Frame: (w, h, 1/w, 1/h)
+        self._src_screen = None
+        # Bildschirmgröße zwischenspeichern (pyautogui.size() fragt jedes Mal den Window-Server)
+        self._cw = self._ch = None
+        self._refresh_screen_size()
+        self._screen_task = None
+        # Maus-Backend wählen und häufig genutzte Funktionen einmalig binden
+        self._backend = _make_backend()
+        # Eingaben in einen Worker-Thread auslagern: automatisch bei blockierendem
+        # Backend, per offload_input erzwingbar (Reihenfolge bleibt erhalten)
+        if offload_input is None:
+            offload_input = self._backend.blocking
+        self.offload_input = bool(offload_input)
+        self.realtime = bool(realtime)
+        if self.offload_input:
+            # Ein Worker-Thread wendet immer nur das neueste Ziel an
+            self._exec = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kvm-input',
+                                            initializer=_raise_thread_priority if realtime else None)
+            self._move_lock = threading.Lock()
+            self._pending_abs = None
+            self._pending_rel = (0, 0)
+            self._move_gen = 0
+            self._inflight = False
+            self._move_abs = self._submit_abs
+            self._moveRel = self._submit_rel
+            self._mouse_button = self._submit_button
+            self._mouse_scroll = self._submit_scroll
+            self._key_event = self._submit_key
+        else:
+            self._move_abs = self._backend.move_to
+            self._moveRel = self._backend.move_rel
+            self._mouse_button = self._backend.button
+            self._mouse_scroll = self._backend.scroll
+            self._key_event = self._press_key
         
-        print(f"KVM Client - Verbinde zu {self.uri}")
+        print(f"KVM Client - Verbinde zu {self.uri} (Maus-Backend: {self._backend.name})")
     
     async def connect_to_server(self):
         """Mit Server verbinden und Events empfangen"""
         try:
-            async with websockets.connect(self.uri, compression=None, max_queue=1) as websocket:
+            # Kein permessage-deflate: bei winzigen Event-Frames kostet zlib mehr als es spart
+            # (muss zu websockets.serve(compression=None) im Server passen)
+            # max_queue > 1: der Reader soll einen Burst komplett aus der Bibliothek ziehen
+            # und in _read_frames zusammenfassen, statt dass alte Frames im TCP-Puffer warten
+            ping_interval = 20 if self.ping_timeout else None
+            async with websockets.connect(self.uri, compression=None, max_queue=RECV_QUEUE,
+                                          max_size=2**16, open_timeout=5,
+                                          ping_interval=ping_interval,
+                                          ping_timeout=self.ping_timeout or None) as websocket:
                 self.connected = True
+                self._src_screen = None  # kommt per 'S'-Frame vom Server
+                if 'permessage-deflate' in _negotiated_extensions(websocket):
+                    print("⚠️  Server hat permessage-deflate ausgehandelt (erhöht die Latenz)")
+                # Bildschirmgröße pro Verbindung frisch einlesen (z.B. nach Monitorwechsel)
+                try:
+                    self._refresh_screen_size()
+                except Exception:
+                    pass
                 # Smoother starten, falls aktiviert
                 if self.interp_enabled and self._smoother_task is None:
                     self._smoother_task = asyncio.create_task(self._smoothing_loop())
+                if self._screen_task is None:
+                    self._screen_task = asyncio.create_task(self._screen_size_loop())
                 print("✓ Verbunden mit KVM Server")
                 print("Bereit zum Empfangen von Remote-Events")
                 
-                async for message in websocket:
-                    try:
-                        data = json.loads(message)
-                        await self.handle_event(data)
-                    except json.JSONDecodeError:
-                        print(f"Ungültiges JSON empfangen: {message}")
-                    except Exception as e:
-                        print(f"Fehler beim Verarbeiten des Events: {e}")
+                # Empfang und Verarbeitung entkoppeln: während ein Event simuliert wird,
+                # sammelt der Reader weiter und fasst aufeinanderfolgende Moves zusammen
+                pending = deque()  # (handler, data)
+                wake = asyncio.Event()
+                reader = asyncio.create_task(self._read_frames(websocket, pending, wake))
+                try:
+                    while True:
+                        await wake.wait()
+                        wake.clear()
+                        while pending:
+                            try:
+                                await self._dispatch(*pending.popleft())
+                            except Exception as e:
+                                print(f"Fehler beim Verarbeiten des Events: {e}")
+                        if reader.done():
+                            # Wirft ConnectionClosed o.ä. weiter
+                            reader.result()
+                            break
+                finally:
+                    reader.cancel()
                         
         except websockets.exceptions.ConnectionClosed:
             print("✗ Verbindung zum Server verloren")
@@ -83,192 +487,381 @@ class KVMClient:
             print(f"✗ Verbindungsfehler: {e}")
         finally:
             self.connected = False
-            # Smoother stoppen
-            try:
-                if self._smoother_task:
-                    self._smoother_task.cancel()
-            except Exception:
-                pass
+            # Smoother und Bildschirm-Refresh stoppen
+            for task in (self._smoother_task, self._screen_task):
+                try:
+                    if task:
+                        task.cancel()
+                except Exception:
+                    pass
             self._smoother_task = None
-    
+            self._screen_task = None
+
+    async def _read_frames(self, websocket, pending, wake):
+        """Frames dekodieren und einreihen; ein neuer mouse_move ersetzt einen noch
+        nicht verarbeiteten mouse_move am Ende der Queue, aufeinanderfolgende Scrolls
+        werden aufsummiert (Reihenfolge zu Klicks/Tasten bleibt)"""
+        # Handler nur einmal pro Frame auflösen; danach reicht ein Identitätsvergleich
+        handlers = self._HANDLERS
+        enqueue = self._enqueue
+        try:
+            async for message in websocket:
+                try:
+                    if isinstance(message, bytes):
+                        handler, data = self._decode_binary(message)
+                    else:
+                        handler, data = None, _loads(message)
+                except (ValueError, struct.error):
+                    # JSONDecodeError und msgpack-Fehler sind ValueError-Subklassen
+                    print(f"Ungültiges Frame empfangen: {message!r}")
+                    continue
+                if handler is None:
+                    if not isinstance(data, dict):
+                        continue
+                    mtype = data.get('type')
+                    if mtype == 'batch':
+                        # Server mit --batch: mehrere Events in einem Frame
+                        events = data.get('events')
+                        if isinstance(events, list):
+                            for event in events:
+                                if isinstance(event, dict):
+                                    handler = handlers.get(event.get('type'))
+                                    if handler is not None:
+                                        enqueue(pending, handler, event)
+                        wake.set()
+                        continue
+                    handler = handlers.get(mtype)
+                    if handler is None:
+                        continue
+                enqueue(pending, handler, data)
+                wake.set()
+        finally:
+            wake.set()
+
+    @staticmethod
+    def _enqueue(pending, handler, data):
+        """Event einreihen bzw. mit dem noch wartenden letzten Event zusammenfassen"""
+        if pending:
+            last = pending[-1][0]
+            # Alle Move-Varianten (dict, binär normalisiert, binär Pixel) ersetzen einander
+            if handler in _MOVE_HANDLERS and last in _MOVE_HANDLERS:
+                pending[-1] = (handler, data)
+                return
+            if (handler is _SCROLL_HANDLER and last is _SCROLL_HANDLER
+                    and KVMClient._merge_scroll(pending[-1][1], data)):
+                return
+        pending.append((handler, data))
+
+    @classmethod
+    def _decode_binary(cls, message):
+        """Binärframe dekodieren -> (handler, payload); handler None = dict-Event"""
+        n = len(message)
+        if n == _MOVE_FRAME_SIZE and message[0] == _MOVE_TAG:
+            return cls._on_norm_frame, _MOVE_FRAME.unpack(message)
+        if n == _PIXEL_FRAME_SIZE:
+            tag = message[0]
+            if tag == _SRC_TAG:
+                return cls._on_src_frame, _SIZE_FRAME.unpack(message)
+            if tag == _PIXEL_TAG:
+                return cls._on_pixel_frame, _PIXEL_FRAME.unpack(message)
+            if tag == _SCREEN_TAG:
+                return cls._on_screen_frame, _SIZE_FRAME.unpack(message)
+        if _unpackb is not None:
+            return None, _unpackb(message)
+        return None, _loads(message)
+
+    @staticmethod
+    def _merge_scroll(last, data):
+        """Scroll-Deltas in das noch offene Scroll-Event übernehmen"""
+        dx, dy = data.get('dx', 0), data.get('dy', 0)
+        ldx, ldy = last.get('dx', 0), last.get('dy', 0)
+        if not all(isinstance(v, _NUMBER) for v in (dx, dy, ldx, ldy)):
+            return False
+        last['dx'] = ldx + dx
+        last['dy'] = ldy + dy
+        return True
+
+    def _refresh_screen_size(self):
+        """Bildschirmgröße und abgeleitete Skalierungswerte neu einlesen"""
+        cw, ch = pyautogui.size()
+        if (cw, ch) != (self._cw, self._ch):
+            self._preserve_params = None
+        self._cw, self._ch = cw, ch
+        self._cw_m1 = max(1, self._cw - 1)
+        self._ch_m1 = max(1, self._ch - 1)
+        # Skalierung für den relativen Modus inkl. Geschwindigkeitsfaktor
+        self._rel_sx = self._cw_m1 * self.speed
+        self._rel_sy = self._ch_m1 * self.speed
+
+    async def _screen_size_loop(self):
+        """Auflösungswechsel erkennen, ohne pyautogui.size() pro Event aufzurufen"""
+        try:
+            while True:
+                await asyncio.sleep(SCREEN_REFRESH_S)
+                try:
+                    self._refresh_screen_size()
+                except Exception:
+                    pass
+        except asyncio.CancelledError:
+            return
+
+    def _submit_abs(self, x, y):
+        """Absolutes Ziel ablegen; ein laufender Worker übernimmt es"""
+        with self._move_lock:
+            self._pending_abs = (x, y)
+            self._pending_rel = (0, 0)
+            self._kick_locked()
+
+    def _submit_rel(self, dx, dy):
+        """Relative Deltas aufsummieren, bis der Worker sie anwendet"""
+        with self._move_lock:
+            px, py = self._pending_rel
+            self._pending_rel = (px + dx, py + dy)
+            self._kick_locked()
+
+    def _kick_locked(self):
+        if not self._inflight:
+            self._inflight = True
+            self._exec.submit(self._apply_latest, self._move_gen)
+
+    def _take_pending_locked(self):
+        target, rel = self._pending_abs, self._pending_rel
+        self._pending_abs = None
+        self._pending_rel = (0, 0)
+        return target, rel
+
+    def _apply_moves(self, target, rel):
+        backend = self._backend
+        try:
+            if target is not None:
+                backend.move_to(*target)
+            if rel[0] or rel[1]:
+                backend.move_rel(*rel)
+        except Exception as e:
+            print(f"Fehler beim Bewegen der Maus: {e}")
+
+    def _apply_latest(self, gen):
+        """Worker: offene Bewegungen anwenden, bis keine mehr anstehen"""
+        while True:
+            with self._move_lock:
+                if gen != self._move_gen:
+                    # Ein Klick hat die Bewegungen bereits übernommen
+                    return
+                target, rel = self._take_pending_locked()
+                if target is None and rel == (0, 0):
+                    self._inflight = False
+                    return
+            self._apply_moves(target, rel)
+
+    def _submit_ordered(self, fn, *args):
+        """Klick/Scroll hinter die bisher empfangenen Bewegungen einreihen"""
+        with self._move_lock:
+            target, rel = self._take_pending_locked()
+            # Laufenden Worker stoppen, damit spätere Moves nicht vor dem Klick landen
+            self._move_gen += 1
+            self._inflight = False
+            self._exec.submit(self._apply_then, target, rel, fn, args)
+
+    def _apply_then(self, target, rel, fn, args):
+        self._apply_moves(target, rel)
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"Fehler beim Simulieren des Maus-Events: {e}")
+
+    def _submit_button(self, button, pressed):
+        self._submit_ordered(self._backend.button, button, pressed)
+
+    def _submit_scroll(self, clicks):
+        self._submit_ordered(self._backend.scroll, clicks)
+
+    def _submit_key(self, key_data, pressed):
+        self._submit_ordered(self._press_key, key_data, pressed)
+
+    def _compute_preserve(self, src_w, src_h):
+        """Aspect-preserving Letterbox/Pillarbox Mapping vorberechnen"""
+        cw, ch = self._cw, self._ch
+        src_aspect = src_w / src_h
+        dst_aspect = cw / ch if ch else 1.0
+        if dst_aspect >= src_aspect:
+            # Client ist relativ breiter -> Höhe voll, Seitenbänder
+            target_h = ch
+            target_w = int(round(target_h * src_aspect))
+            x_off = (cw - target_w) // 2
+            y_off = 0
+        else:
+            # Client ist relativ höher -> Breite voll, obere/untere Bänder
+            target_w = cw
+            target_h = int(round(target_w / src_aspect))
+            x_off = 0
+            y_off = (ch - target_h) // 2
+        return (src_w, src_h, x_off, y_off,
+                max(1, target_w - 1), max(1, target_h - 1))
+
     async def handle_event(self, data):
         """Empfangenes Event verarbeiten"""
-        event_type = data.get('type')
-        
-        try:
-            if event_type == 'mouse_move':
-                # Koordinaten ggf. von normalisiert [0,1] in Bildschirm-Pixel umrechnen
-                coord_mode = data.get('coord')
-                if coord_mode == 'normalized':
-                    try:
-                        cw, ch = pyautogui.size()
-                        x_norm = max(0.0, min(1.0, float(data['x'])))
-                        y_norm = max(0.0, min(1.0, float(data['y'])))
-
-                        # Relative Modus: auf Pixel-Deltas abbilden und relativ bewegen
-                        if self.map_mode == 'relative':
-                            if self._last_incoming_norm is None:
-                                self._last_incoming_norm = (x_norm, y_norm)
-                                return
-                            last_xn, last_yn = self._last_incoming_norm
-                            dx = int((x_norm - last_xn) * max(1, cw-1) * self.speed)
-                            dy = int((y_norm - last_yn) * max(1, ch-1) * self.speed)
-                            self._last_incoming_norm = (x_norm, y_norm)
-                            # Deadzone-Filter gegen Mikro-Jitter
-                            if abs(dx) < self.deadzone_px and abs(dy) < self.deadzone_px:
-                                return
-                            if dx != 0 or dy != 0:
-                                if self.interp_enabled:
-                                    self._pending_dx += dx
-                                    self._pending_dy += dy
-                                else:
-                                    pyautogui.moveRel(dx, dy, duration=0)
-                            return
-
-                        if self.map_mode == 'preserve' and data.get('src_w') and data.get('src_h'):
-                            # Aspect-preserving Letterbox/Pillarbox Mapping
-                            src_w = float(data['src_w'])
-                            src_h = float(data['src_h'])
-                            if src_w <= 0 or src_h <= 0:
-                                raise ValueError('invalid src size')
-                            src_aspect = src_w / src_h
-                            dst_aspect = cw / ch if ch else 1.0
-                            if dst_aspect >= src_aspect:
-                                # Client ist relativ breiter -> Höhe voll, Seitenbänder
-                                target_h = ch
-                                target_w = int(round(target_h * src_aspect))
-                                x_off = (cw - target_w) // 2
-                                y_off = 0
-                            else:
-                                # Client ist relativ höher -> Breite voll, obere/untere Bänder
-                                target_w = cw
-                                target_h = int(round(target_w / src_aspect))
-                                x_off = 0
-                                y_off = (ch - target_h) // 2
-                            x = int(x_off + x_norm * max(1, target_w-1))
-                            y = int(y_off + y_norm * max(1, target_h-1))
-                        else:
-                            # Vollflächig strecken (Standard)
-                            x = int(x_norm * max(1, cw-1))
-                            y = int(y_norm * max(1, ch-1))
-                    except Exception:
-                        # Fallback auf Mitte, wenn etwas schief geht
-                        cw, ch = pyautogui.size()
-                        x, y = cw // 2, ch // 2
-                else:
-                    x, y = int(data['x']), int(data['y'])
-                    if self.map_mode == 'relative':
-                        if self._last_incoming_abs is None:
-                            self._last_incoming_abs = (x, y)
-                            return
-                        last_x, last_y = self._last_incoming_abs
-                        dx = int((x - last_x) * self.speed)
-                        dy = int((y - last_y) * self.speed)
-                        self._last_incoming_abs = (x, y)
-                        # Deadzone-Filter gegen Mikro-Jitter
-                        if abs(dx) < self.deadzone_px and abs(dy) < self.deadzone_px:
-                            return
-                        if dx != 0 or dy != 0:
-                            if self.interp_enabled:
-                                self._pending_dx += dx
-                                self._pending_dy += dy
-                            else:
-                                pyautogui.moveRel(dx, dy, duration=0)
-                        return
+        handler = self._HANDLERS.get(data.get('type'))
+        if handler is None:
+            return
+        await self._dispatch(handler, data)
 
-                # Absolute Modi: direkt oder via Interpolation
-                if self.interp_enabled:
-                    self._target_pos = (x, y)
-                else:
-                    # Bei direkter Bewegung: nur bewegen, wenn außerhalb der Deadzone
-                    if self._last_mouse_pos is None or (
-                        abs((self._last_mouse_pos[0] - x)) >= self.deadzone_px or
-                        abs((self._last_mouse_pos[1] - y)) >= self.deadzone_px
-                    ):
-                        if _HAS_QUARTZ:
-                            try:
-                                Quartz.CGWarpMouseCursorPosition((x, y))
-                            except Exception:
-                                pyautogui.moveTo(x, y, duration=0)
-                        else:
-                            pyautogui.moveTo(x, y, duration=0)
-                        self._last_mouse_pos = (x, y)
-                
-            elif event_type == 'mouse_click':
-                button_map = {
-                    'left': 'left',
-                    'right': 'right', 
-                    'middle': 'middle'
-                }
-                
-                button = button_map.get(data['button'], 'left')
-                
-                if data['pressed']:
-                    pyautogui.mouseDown(button=button)
-                else:
-                    pyautogui.mouseUp(button=button)
-                    
-            elif event_type == 'mouse_scroll':
-                # Scroll-Richtung umkehren für natürliches Scrolling
-                scroll_amount = data['dy'] * 3  # Scroll-Geschwindigkeit anpassen
-                pyautogui.scroll(scroll_amount)
-                
-            elif event_type == 'key_press':
-                await self.simulate_key_press(data['key'], True)
-                
-            elif event_type == 'key_release':
-                await self.simulate_key_press(data['key'], False)
-                
+    async def _dispatch(self, handler, data):
+        """Bereits aufgelösten Handler ausführen"""
+        try:
+            # Handler sind synchron; Coroutinen (z.B. Erweiterungen) werden abgewartet
+            result = handler(self, data)
+            if result is not None:
+                await result
         except Exception as e:
-            print(f"Fehler beim Simulieren des Events {event_type}: {e}")
+            print(f"Fehler beim Simulieren des Events {data.get('type')}: {e}")
+
+    def _on_mouse_move(self, data):
+        """mouse_move: absolute, normalisierte oder relative Bewegung"""
+        x, y = data.get('x'), data.get('y')
+        # Kaputte Koordinaten explizit verwerfen statt per Exception auf die Mitte zu springen
+        if not (isinstance(x, _NUMBER) and isinstance(y, _NUMBER)):
+            return
+        if data.get('coord') == 'normalized':
+            self._move_normalized(x, y, data.get('src_w'), data.get('src_h'))
+        else:
+            self._move_pixels(int(x), int(y))
+
+    def _on_norm_frame(self, frame):
+        """Binäres Move-Frame (normalisiert), ohne Umweg über ein dict"""
+        _tag, qx, qy, src_w, src_h = frame
+        # Festkomma liegt per Konstruktion in [0,1] -> kein Clamp nötig
+        self._move_norm01(qx * _Q16, qy * _Q16, src_w, src_h)
+
+    def _on_src_frame(self, frame):
+        """Binäres Move-Frame in Server-Pixeln, normalisiert über die 'S'-Größe"""
+        src = self._src_screen
+        if src is None:
+            return  # noch kein Handshake
+        _tag, x, y = frame
+        # Server sendet nur Pixel innerhalb seiner Größe -> Ergebnis liegt in [0,1]
+        self._move_norm01(x * src[2], y * src[3], src[0], src[1])
+
+    def _on_screen_frame(self, frame):
+        """Handshake: Bildschirmgröße des Servers für folgende 'P'-Frames"""
+        _tag, w, h = frame
+        self._src_screen = (w, h, 1.0 / w, 1.0 / h) if w and h else None
+
+    def _on_pixel_frame(self, frame):
+        """Binäres Move-Frame (Pixel), ohne Umweg über ein dict"""
+        _tag, x, y = frame
+        self._move_pixels(x, y)
+
+    def _move_normalized(self, x, y, src_w, src_h):
+        # Koordinaten von normalisiert [0,1] in Bildschirm-Pixel umrechnen
+        self._move_norm01(_clamp01(x), _clamp01(y), src_w, src_h)
+
+    def _move_norm01(self, x_norm, y_norm, src_w, src_h):
+        # Relative Modus: auf Pixel-Deltas abbilden und relativ bewegen
+        if self.map_mode == 'relative':
+            last = self._last_incoming_norm
+            self._last_incoming_norm = (x_norm, y_norm)
+            if last is not None:
+                self._queue_rel(int((x_norm - last[0]) * self._rel_sx),
+                                int((y_norm - last[1]) * self._rel_sy))
+            return
+        self._apply_abs(*self._map_normalized(x_norm, y_norm, src_w, src_h))
+
+    def _move_pixels(self, x, y):
+        if self.map_mode == 'relative':
+            last = self._last_incoming_abs
+            self._last_incoming_abs = (x, y)
+            if last is not None:
+                self._queue_rel(int((x - last[0]) * self.speed),
+                                int((y - last[1]) * self.speed))
+            return
+        self._apply_abs(x, y)
+
+    def _apply_abs(self, x, y):
+        """Absolute Modi: direkt oder via Interpolation"""
+        if self.interp_enabled:
+            self._target_pos = (x, y)
+            self._work_ev.set()
+        else:
+            # Bei direkter Bewegung: identische Position sofort verwerfen,
+            # sonst nur bewegen, wenn außerhalb der Deadzone
+            lp = self._last_mouse_pos
+            if lp is None or (
+                (lp[0] != x or lp[1] != y) and
+                (abs(lp[0] - x) >= self.deadzone_px or abs(lp[1] - y) >= self.deadzone_px)
+            ):
+                self._move_abs(x, y)
+                self._last_mouse_pos = (x, y)
+
+    def _map_normalized(self, x_norm, y_norm, src_w, src_h):
+        """Normalisierte Koordinaten auf Pixel abbilden (preserve oder vollflächig)"""
+        if self.map_mode == 'preserve':
+            if isinstance(src_w, _NUMBER) and isinstance(src_h, _NUMBER) and src_w > 0 and src_h > 0:
+                # Letterbox-Parameter nur bei neuer Quell-/Zielgröße neu berechnen
+                params = self._preserve_params
+                if params is None or params[0] != src_w or params[1] != src_h:
+                    params = self._preserve_params = self._compute_preserve(src_w, src_h)
+                _sw, _sh, x_off, y_off, sx, sy = params
+                return int(x_off + x_norm * sx), int(y_off + y_norm * sy)
+        # Vollflächig strecken (Standard)
+        return int(x_norm * self._cw_m1), int(y_norm * self._ch_m1)
+
+    def _queue_rel(self, dx, dy):
+        """Relative Bewegung ausführen bzw. für den Smoother vormerken"""
+        # Deadzone-Filter gegen Mikro-Jitter
+        if abs(dx) < self.deadzone_px and abs(dy) < self.deadzone_px:
+            return
+        if dx != 0 or dy != 0:
+            if self.interp_enabled:
+                self._pending_dx += dx
+                self._pending_dy += dy
+                self._work_ev.set()
+            else:
+                self._moveRel(dx, dy)
+
+    def _on_mouse_click(self, data):
+        """mouse_click: Taste drücken/loslassen"""
+        button = _BUTTON_MAP.get(data['button'], 'left')
+        self._mouse_button(button, bool(data['pressed']))
+
+    def _on_mouse_scroll(self, data):
+        """mouse_scroll: vertikal scrollen"""
+        # Scroll-Richtung umkehren für natürliches Scrolling
+        scroll_amount = data['dy'] * 3  # Scroll-Geschwindigkeit anpassen
+        self._mouse_scroll(scroll_amount)
+
+    def _on_key_press(self, data):
+        self._key_event(data['key'], True)
+
+    def _on_key_release(self, data):
+        self._key_event(data['key'], False)
     
     async def simulate_key_press(self, key_data, pressed):
         """Tastendruck simulieren"""
+        self._press_key(key_data, pressed)
+
+    def _press_key(self, key_data, pressed):
+        """Tastendruck synchron über pynput ausführen"""
         try:
-            # Spezielle Tasten behandeln
-            special_keys = {
-                'Key.alt': Key.alt,
-                'Key.alt_l': Key.alt_l,
-                'Key.alt_r': Key.alt_r,
-                'Key.ctrl': Key.ctrl,
-                'Key.ctrl_l': Key.ctrl_l,
-                'Key.ctrl_r': Key.ctrl_r,
-                'Key.shift': Key.shift,
-                'Key.shift_l': Key.shift_l,
-                'Key.shift_r': Key.shift_r,
-                'Key.cmd': Key.cmd,
-                'Key.cmd_l': Key.cmd_l,
-                'Key.cmd_r': Key.cmd_r,
-                'Key.space': Key.space,
-                'Key.enter': Key.enter,
-                'Key.tab': Key.tab,
-                'Key.backspace': Key.backspace,
-                'Key.delete': Key.delete,
-                'Key.esc': Key.esc,
-                'Key.up': Key.up,
-                'Key.down': Key.down,
-                'Key.left': Key.left,
-                'Key.right': Key.right,
-                'Key.home': Key.home,
-                'Key.end': Key.end,
-                'Key.page_up': Key.page_up,
-                'Key.page_down': Key.page_down,
-            }
-            
-            if key_data in special_keys:
-                key = special_keys[key_data]
-                if pressed:
-                    self.keyboard_controller.press(key)
+            # Ganzzahliger Code vom Server: Codepoint bzw. ~Index einer Sondertaste
+            if type(key_data) is int:
+                if key_data >= 0:
+                    key = chr(key_data)
                 else:
-                    self.keyboard_controller.release(key)
+                    key = _KEY_TABLE[~key_data]
+                    if key is None:
+                        return
+            # Normale Zeichen zuerst (häufigster Fall beim Tippen)
+            elif len(key_data) == 1:
+                key = key_data
             else:
-                # Normale Zeichen
-                if len(key_data) == 1:
-                    if pressed:
-                        self.keyboard_controller.press(key_data)
-                    else:
-                        self.keyboard_controller.release(key_data)
-                        
+                # Spezielle Tasten, unbekannte ignorieren
+                key = _SPECIAL_KEYS.get(key_data)
+                if key is None:
+                    return
+            if pressed:
+                self.keyboard_controller.press(key)
+            else:
+                self.keyboard_controller.release(key)
         except Exception as e:
             print(f"Fehler beim Simulieren der Taste '{key_data}': {e}")
     
@@ -277,13 +870,28 @@ class KVMClient:
         try:
             # Initialisiere letzte bekannte Position
             try:
-                cx, cy = pyautogui.position()
+                cx, cy = self._backend.position()
             except Exception:
-                cw, ch = pyautogui.size()
-                cx, cy = cw // 2, ch // 2
+                cx, cy = self._cw // 2, self._ch // 2
             self._last_mouse_pos = (cx, cy)
 
             step_sleep = max(0.001, 1.0 / float(self.interp_rate_hz))
+            # Feste Deadlines statt fester Sleeps, damit die Dauer des Move-Calls
+            # die effektive Schrittrate nicht senkt
+            loop = asyncio.get_running_loop()
+            deadline = loop.time()
+
+            async def tick():
+                nonlocal deadline
+                deadline += step_sleep
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    # Hinterher: nicht aufholen, sondern neu takten
+                    deadline = loop.time()
+                    await asyncio.sleep(0)
+
             while True:
                 # Relative Modus: verbrauche ausstehende Deltas
                 if self.map_mode == 'relative':
@@ -293,72 +901,62 @@ class KVMClient:
                     if abs(dx) < self.deadzone_px and abs(dy) < self.deadzone_px:
                         self._pending_dx = 0
                         self._pending_dy = 0
-                        await asyncio.sleep(step_sleep)
                     elif dx == 0 and dy == 0:
-                        await asyncio.sleep(step_sleep)
+                        pass
                     else:
                         # Begrenze Schrittgröße
                         step_x = max(-self.interp_step_px, min(self.interp_step_px, dx))
                         step_y = max(-self.interp_step_px, min(self.interp_step_px, dy))
                         self._pending_dx -= step_x
                         self._pending_dy -= step_y
-                        pyautogui.moveRel(step_x, step_y, duration=0)
-                        # last pos ggf. aktualisieren
-                        try:
-                            cx, cy = pyautogui.position()
-                            self._last_mouse_pos = (cx, cy)
-                        except Exception:
-                            pass
-                        await asyncio.sleep(step_sleep)
+                        # _last_mouse_pos wird nur von den absoluten Modi gelesen, daher
+                        # hier keine Positionsabfrage pro Schritt
+                        self._moveRel(step_x, step_y)
+                        await tick()
+                        continue
+                    await self._wait_for_work()
+                    deadline = loop.time()
                     continue
 
                 # Absolute Modi: bewege dich schrittweise auf Zielposition
                 tx_ty = self._target_pos
                 if not tx_ty:
-                    await asyncio.sleep(step_sleep)
+                    await self._wait_for_work()
+                    deadline = loop.time()
                     continue
                 tx, ty = tx_ty
                 lx, ly = self._last_mouse_pos if self._last_mouse_pos else (tx, ty)
                 dx = tx - lx
                 dy = ty - ly
-                # Deadzone: wenn nahe am Ziel, schnapp auf Ziel und warte
+                # Deadzone: einmal auf das Ziel schnappen, dann auf neue Ziele warten
                 if abs(dx) <= self.deadzone_px and abs(dy) <= self.deadzone_px:
-                    if _HAS_QUARTZ:
-                        try:
-                            Quartz.CGWarpMouseCursorPosition((int(tx), int(ty)))
-                        except Exception:
-                            pyautogui.moveTo(int(tx), int(ty), duration=0)
-                    else:
-                        pyautogui.moveTo(int(tx), int(ty), duration=0)
-                    self._last_mouse_pos = (int(tx), int(ty))
-                    await asyncio.sleep(step_sleep)
+                    if dx or dy:
+                        self._move_abs(int(tx), int(ty))
+                        self._last_mouse_pos = (int(tx), int(ty))
+                    await self._wait_for_work()
+                    deadline = loop.time()
                     continue
                 # Easing: Schritt proportional zur verbleibenden Strecke, gekappt
-                def _ease_component(delta: int) -> int:
-                    mag = abs(delta)
-                    # 40% der Reststrecke, mind. 1px, max. interp_step_px
-                    step = max(1, min(self.interp_step_px, int(mag * 0.4)))
-                    return step if delta > 0 else -step
-
-                step_x = _ease_component(dx)
-                step_y = _ease_component(dy)
-                nx = lx + step_x
-                ny = ly + step_y
+                max_step = self.interp_step_px
+                nx = lx + _ease_step(dx, max_step)
+                ny = ly + _ease_step(dy, max_step)
                 # Setze neue Position
-                if _HAS_QUARTZ:
-                    try:
-                        Quartz.CGWarpMouseCursorPosition((int(nx), int(ny)))
-                    except Exception:
-                        pyautogui.moveTo(int(nx), int(ny), duration=0)
-                else:
-                    pyautogui.moveTo(int(nx), int(ny), duration=0)
+                self._move_abs(int(nx), int(ny))
                 self._last_mouse_pos = (int(nx), int(ny))
-                await asyncio.sleep(step_sleep)
+                await tick()
         except asyncio.CancelledError:
             return
     
+    async def _wait_for_work(self):
+        """Schlafen, bis _on_mouse_move ein neues Ziel oder Delta meldet"""
+        self._work_ev.clear()
+        await self._work_ev.wait()
+
     async def run(self):
         """Client dauerhaft laufen lassen mit Reconnect"""
+        if self.realtime:
+            # Der Thread mit dem Eventloop empfängt und simuliert die Events
+            _raise_thread_priority()
         while True:
             try:
                 await self.connect_to_server()
@@ -370,6 +968,37 @@ class KVMClient:
                 print("Versuche Reconnect in 5 Sekunden...")
                 await asyncio.sleep(5)
 
+    def close(self):
+        """Worker-Thread freigeben, nachdem run() beendet bzw. abgebrochen wurde"""
+        if self.offload_input:
+            self._exec.shutdown(wait=False)
+
+    # Event-Typ -> Handler, einmal pro Klasse statt if/elif-Kette pro Frame
+    _HANDLERS = {
+        'mouse_move': _on_mouse_move,
+        'mouse_click': _on_mouse_click,
+        'mouse_scroll': _on_mouse_scroll,
+        'key_press': _on_key_press,
+        'key_release': _on_key_release,
+    }
+
+_MOVE_HANDLERS = frozenset((KVMClient._on_mouse_move, KVMClient._on_norm_frame,
+                            KVMClient._on_pixel_frame, KVMClient._on_src_frame))
+_SCROLL_HANDLER = KVMClient._on_mouse_scroll
+
+def _run(coro):
+    """Coroutine auf uvloop ausführen, falls installiert, sonst auf dem Standard-Loop"""
+    if _new_event_loop is None:
+        asyncio.run(coro)
+    elif sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+            runner.run(coro)
+    else:
+        # asyncio.Runner gibt es erst ab 3.11
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(coro)
+
+
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='KVM Client - Remote Event Simulator')
@@ -382,6 +1011,14 @@ def main():
     parser.add_argument('--interp-step-px', type=int, default=10, help='Maximale Schrittgröße pro Glättungsschritt (Pixel)')
     parser.add_argument('--speed', type=float, default=1.0, help='Geschwindigkeitsfaktor für Mausbewegungen (nur relative Modi)')
     parser.add_argument('--deadzone-px', type=int, default=1, help='Deadzone in Pixel zur Jitter-Filterung')
+    parser.add_argument('--offload-input', action='store_true', default=None,
+                        help='Maus/Tastatur immer in einem Worker-Thread simulieren '
+                             '(Standard: nur bei blockierendem Backend)')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Eventloop- und Eingabe-Thread mit erhöhter Priorität ausführen '
+                             '(SCHED_FIFO/QoS/TIME_CRITICAL, braucht ggf. Rechte)')
+    parser.add_argument('--ping-timeout', type=float, default=10.0,
+                        help='Sekunden ohne Pong bis zum Reconnect (0 = Keepalive-Pings aus)')
     args = parser.parse_args()
 
     client = KVMClient(args.server_host, args.port, map_mode=args.map,
@@ -389,10 +1026,13 @@ def main():
                       interp_rate_hz=args.interp_rate_hz,
                       interp_step_px=args.interp_step_px,
                       deadzone_px=args.deadzone_px,
-                      speed=args.speed)
+                      speed=args.speed,
+                      ping_timeout=args.ping_timeout,
+                      offload_input=args.offload_input,
+                      realtime=args.realtime)
 
     try:
-        asyncio.run(client.run())
+        _run(client.run())
     except KeyboardInterrupt:
         print("\nProgramm beendet.")
 
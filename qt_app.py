@@ -4,31 +4,77 @@
 GUI for KVM Control (PySimpleGUI)
 - Multicast discovery (BEACON)
 - Request/approval flow via UDP
-- Spawns Python server.py and client.py as subprocesses
+- Spawns server.py as a subprocess; runs the client in-process on its own thread
 - Compact, native-feeling UI
 
 Run: python3 qt_app.py
 """
 import sys
 import os
+import bisect
+import heapq
 import json
 import uuid
 import time
 import socket
+import asyncio
+import struct
 import subprocess
 import threading
-from dataclasses import dataclass
+import zlib
+from dataclasses import dataclass, asdict
 from typing import Dict
 
 import FreeSimpleGUI as sg
+# Optional C JSON codec for discovery datagrams
+try:
+    import orjson
+    _HAS_ORJSON = True
+except Exception:
+    _HAS_ORJSON = False
 
 MCAST_GRP = '239.255.255.250'
 MCAST_PORT = 54545
 BEACON_INTERVAL_S = 2
+# Deliver our own beacons back to this host; only needed to see other instances on the same machine
+MCAST_LOOP = False
+# Devices silent for longer than this are dropped; override per Discovery via device_ttl_s
 DEVICE_TTL_S = BEACON_INTERVAL_S * 3 + 2
-
-
-def get_primary_ip() -> str:
+PRUNE_INTERVAL_S = 2
+RECV_BATCH = 16
+RECV_BUF_SIZE = 2048
+# Kernel receive queue for the discovery socket, so bursts of beacons are not dropped.
+# Linux caps this at net.core.rmem_max without an error.
+SOCK_RCVBUF = 1 << 20
+IP_REFRESH_S = 30
+# Compact binary beacon: magic, version, uuid, ipv4, ws_port, utf-8 name (NUL padded).
+# Off by default because the Electron and Rust peers only understand JSON beacons;
+# receiving binary beacons is always supported.
+BINARY_BEACONS = False
+BEACON_MAGIC = b'KV'
+BEACON_VERSION = 1
+BEACON_FMT = '!2sB16s4sH64s'
+# Precompiled so the format string isn't re-parsed on every pack/unpack
+_BEACON = struct.Struct(BEACON_FMT)
+_MREQ = struct.Struct('4s4s')
+BEACON_SIZE = _BEACON.size
+
+
+if _HAS_ORJSON:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    # Compact and without \u escapes for non-ASCII hostnames, like orjson's output
+    _encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+    def _dumps(obj) -> bytes:
+        return _encode(obj).encode('utf-8')
+
+    def _loads(data):
+        return json.loads(bytes(data))
+
+
+def _resolve_primary_ip() -> str:
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(('8.8.8.8', 80))
@@ -39,128 +85,286 @@ def get_primary_ip() -> str:
         return '127.0.0.1'
 
 
-@dataclass
+_cached_ip = (None, 0.0)
+
+_SERVER_PY = os.path.join(os.path.dirname(__file__), 'server.py')
+
+# close_fds=False lets subprocess take its posix_spawn() fast path instead of
+# fork()+exec() of the whole GUI process; inherited stdio already qualifies.
+# Safe because Python creates fds non-inheritable (PEP 446).
+_POPEN_KW = {}
+if os.name == 'posix':
+    _POPEN_KW['close_fds'] = False
+
+
+def get_primary_ip(max_age_s: float = IP_REFRESH_S) -> str:
+    # Cached so GUI clicks and request messages don't open a socket each time
+    global _cached_ip
+    ip, ts = _cached_ip
+    now = time.monotonic()
+    if ip is None or now - ts > max_age_s:
+        ip = _resolve_primary_ip()
+        _cached_ip = (ip, now)
+    return ip
+
+
+@dataclass(slots=True)
 class Device:
     instance_id: str
     name: str
     ip: str
     ws_port: int
-    last_seen: float
+    last_seen: float  # time.monotonic(), immune to wall-clock steps
 
 
 class Discovery(threading.Thread):
-    def __init__(self, instance_id: str, name: str, ws_port: int, window: sg.Window):
+    def __init__(self, instance_id: str, name: str, ws_port: int, window: sg.Window,
+                 device_ttl_s: float = DEVICE_TTL_S):
         super().__init__(daemon=True)
         self.instance_id = instance_id
         self.name = name
         self.ws_port = ws_port
         self.window = window
+        self.device_ttl_s = device_ttl_s
         self._devices: Dict[str, Device] = {}
+        # addr -> (hash of last beacon payload, instance_id)
+        self._beacon_seen: Dict[str, tuple] = {}
+        # (expire_at, instance_id) min-heap, one entry per device. Refreshing last_seen
+        # does not touch it; an entry found stale on pop is pushed back with its real expiry.
+        self._expiry: list[tuple[float, str]] = []
+        self._prune_timer = None
+        self._devices_dirty = False
+        self._snapshot: Dict[str, dict] = {}
+        self._update_pending = False
+        self._log_lines: list[str] = []
+        self._ip = get_primary_ip()
+        self._beacon_bytes = self._build_beacon()
         self.sock = self._create_socket()
-        self._running = True
+        self._send_sock = self._create_send_socket()
+        self._rx_buf = bytearray(RECV_BUF_SIZE)
+        self._rx_view = memoryview(self._rx_buf)
+        # Created here so send_request() can queue work before run() starts
+        self._loop = asyncio.SelectorEventLoop()
 
     def _create_socket(self):
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # SO_REUSEPORT lets other apps on this host share the discovery port. It is not used
+        # to fan out over several receiver sockets: multicast datagrams are copied to every
+        # socket in the group rather than hashed across them, so N receivers would parse
+        # each beacon N times.
         try:
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         except AttributeError:
             pass
-        local_ip = get_primary_ip()
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCK_RCVBUF)
+        except OSError:
+            pass
+        local_ip = self._ip
         sock.bind(('', MCAST_PORT))
-        mreq = socket.inet_aton(MCAST_GRP) + socket.inet_aton(local_ip)
+        mreq = _MREQ.pack(socket.inet_aton(MCAST_GRP), socket.inet_aton(local_ip))
         sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
         sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(local_ip))
         sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 32)
         sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
-        sock.settimeout(1.0)
+        # Non-blocking: the loop waits for readiness once and then drains the queue
+        sock.setblocking(False)
         try:
             self.window.write_event_value('-LOG_EVENT-', f'[Discovery] Bound on {local_ip}:{MCAST_PORT}, joined {MCAST_GRP}')
         except Exception:
             pass
         return sock
 
+    def _create_send_socket(self):
+        # One long-lived sender for multicast traffic instead of a socket per beacon
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self._ip))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 32)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1 if MCAST_LOOP else 0)
+        except Exception:
+            pass
+        return sock
+
     def run(self):
-        last_beacon = 0
-        last_prune = 0
+        # One selector loop drives receive readiness and the beacon/prune/IP timers
+        loop = self._loop
+        loop.add_reader(self.sock, self._on_readable)
+        loop.call_soon(self._beacon_tick)
+        loop.call_later(IP_REFRESH_S, self._ip_tick)
+        try:
+            loop.run_forever()
+        finally:
+            loop.remove_reader(self.sock)
+            loop.close()
+            for sock in (self.sock, self._send_sock):
+                try:
+                    sock.close()
+                except Exception:
+                    pass
 
-        while self._running:
-            now = time.time()
-            if now - last_beacon > BEACON_INTERVAL_S:
-                self._send_beacon()
-                last_beacon = now
+    def _on_readable(self):
+        try:
+            for data, addr in self._recv_batch():
+                self._log(f'[Discovery] recv {len(data)} bytes from {addr[0]}')
+                self._handle_message(data, addr[0])
+        except Exception as e:
+            print(f"[Discovery] Error: {e}")
+            self._log(f'[Discovery] Error: {e}')
+        self._flush_devices()
+        self._flush_log()
+
+    def _log(self, line: str):
+        # Loop-thread log lines are collected and posted to the GUI once per batch/tick
+        self._log_lines.append(line)
+
+    def _flush_log(self):
+        if self._log_lines:
+            self.window.write_event_value('-LOG_EVENT-', '\n'.join(self._log_lines))
+            self._log_lines.clear()
+
+    def _beacon_tick(self):
+        self._send_beacon()
+        self._flush_log()
+        self._loop.call_later(BEACON_INTERVAL_S, self._beacon_tick)
+
+    def _prune_tick(self):
+        self._prune_devices()
+        self._flush_devices()
+        # Only runs while there is something to expire; restarted by the next new device
+        if self._expiry:
+            self._prune_timer = self._loop.call_later(PRUNE_INTERVAL_S, self._prune_tick)
+        else:
+            self._prune_timer = None
 
-            if now - last_prune > 2:
-                self._prune_devices()
-                last_prune = now
+    def _ip_tick(self):
+        self._refresh_ip()
+        self._flush_log()
+        self._loop.call_later(IP_REFRESH_S, self._ip_tick)
 
+    def _flush_devices(self):
+        # At most one GUI refresh per drained batch, however many beacons it held
+        if not self._devices_dirty:
+            return
+        self._devices_dirty = False
+        self._snapshot = {k: asdict(v) for k, v in self._devices.items()}
+        # Single-slot handoff: only wake the GUI if it has taken the previous snapshot
+        if not self._update_pending:
+            self._update_pending = True
+            self.window.write_event_value('-DEVICES_CHANGED-', None)
+
+    def _recv_batch(self):
+        # One readiness wait per burst instead of poll+recvfrom per datagram.
+        # Datagrams land in a reused buffer; each view is only valid until the next one.
+        for _ in range(RECV_BATCH):
             try:
-                data, addr = self.sock.recvfrom(1024)
-                self.window.write_event_value('-LOG_EVENT-', f'[Discovery] recv {len(data)} bytes from {addr[0]}')
-                self._handle_message(data, addr[0])
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(f"[Discovery] Error: {e}")
-                self.window.write_event_value('-LOG_EVENT-', f'[Discovery] Error: {e}')
+                n, addr = self.sock.recvfrom_into(self._rx_buf)
+            except (BlockingIOError, InterruptedError):
+                return
+            yield self._rx_view[:n], addr
+
+    def devices(self) -> Dict[str, dict]:
+        # Replaced wholesale on change and never mutated, so readers need no lock or copy
+        return self._snapshot
+
+    def take_devices(self) -> Dict[str, dict]:
+        # Called by the GUI for -DEVICES_CHANGED-; clear first so a newer snapshot re-notifies
+        self._update_pending = False
+        return self._snapshot
 
     def stop(self):
-        self._running = False
+        try:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        except RuntimeError:
+            pass  # loop already closed
 
     def _send(self, payload: dict, target_ip: str):
-        data = json.dumps(payload).encode('utf-8')
+        # May be called from the GUI thread; the socket is only touched on the loop thread
+        self._loop.call_soon_threadsafe(self._sendto, _dumps(payload), target_ip)
+
+    def _sendto(self, data: bytes, target_ip: str):
         try:
             self.sock.sendto(data, (target_ip, MCAST_PORT))
             print(f'[Discovery] unicast {len(data)} bytes to {target_ip}:{MCAST_PORT}')
         except Exception as e:
             print(f'[Discovery] unicast error to {target_ip}: {e}')
 
-    def _broadcast(self, payload: dict):
-        data = json.dumps(payload).encode('utf-8')
-        local_ip = get_primary_ip()
+    def _broadcast(self, data: bytes):
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-            try:
-                s.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(local_ip))
-                s.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 32)
-            except Exception:
-                pass
-            s.sendto(data, (MCAST_GRP, MCAST_PORT))
+            self._send_sock.sendto(data, (MCAST_GRP, MCAST_PORT))
         except Exception as e:
             print(f'[Discovery] broadcast error: {e}')
-        finally:
-            try:
-                s.close()
-            except Exception:
-                pass
 
-    def _send_beacon(self):
-        msg = {
+    def _build_beacon(self) -> bytes:
+        # The beacon only changes with the primary IP, so it is encoded once and reused
+        if BINARY_BEACONS:
+            return _BEACON.pack(BEACON_MAGIC, BEACON_VERSION, uuid.UUID(self.instance_id).bytes,
+                               socket.inet_aton(self._ip), self.ws_port, self.name.encode('utf-8')[:64])
+        return _dumps({
             'type': 'BEACON',
             'instance_id': self.instance_id,
             'name': self.name,
-            'ip': get_primary_ip(),
+            'ip': self._ip,
             'ws_port': self.ws_port,
             'version': 1,
-        }
-        self._broadcast(msg)
-        self.window.write_event_value('-LOG_EVENT-', f"[Discovery] Beacon sent {self.name} {get_primary_ip()}:{self.ws_port}")
+        })
+
+    def _refresh_ip(self):
+        ip = get_primary_ip(max_age_s=0)
+        if ip == self._ip:
+            return
+        self._ip = ip
+        self._beacon_bytes = self._build_beacon()
+        try:
+            self._send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(ip))
+        except Exception:
+            pass
+        self._log(f'[Discovery] Primary IP changed to {ip}')
+
+    def _send_beacon(self):
+        self._broadcast(self._beacon_bytes)
+        self._log(f"[Discovery] Beacon sent {self.name} {self._ip}:{self.ws_port}")
 
     def _prune_devices(self):
-        now = time.time()
+        expiry = self._expiry
+        now = time.monotonic()
         removed = False
-        for inst, dev in list(self._devices.items()):
-            if now - dev.last_seen > DEVICE_TTL_S:
+        while expiry and expiry[0][0] < now:
+            _expire_at, inst = heapq.heappop(expiry)
+            dev = self._devices.get(inst)
+            if dev is None:
+                continue
+            expire_at = dev.last_seen + self.device_ttl_s
+            if expire_at >= now:
+                heapq.heappush(expiry, (expire_at, inst))
+            else:
                 del self._devices[inst]
                 removed = True
         if removed:
-            self.window.write_event_value('-DEVICES_CHANGED-', {k: vars(v) for k, v in self._devices.items()})
+            self._beacon_seen = {a: s for a, s in self._beacon_seen.items() if s[1] in self._devices}
+            self._devices_dirty = True
 
-    def _handle_message(self, data: bytes, addr: str):
-        try:
-            msg = json.loads(data.decode('utf-8'))
-        except Exception:
+    def _handle_message(self, data: memoryview, addr: str):
+        # Our own beacon looped back by multicast: byte-identical to what we sent
+        if len(data) == len(self._beacon_bytes) and data == self._beacon_bytes:
             return
+        # Repeated, byte-identical beacon from a known peer: refresh it without parsing
+        digest = zlib.crc32(data)
+        seen = self._beacon_seen.get(addr)
+        if seen is not None and seen[0] == digest:
+            dev = self._devices.get(seen[1])
+            now = time.monotonic()
+            if dev is not None and now - dev.last_seen < BEACON_INTERVAL_S * 2:
+                dev.last_seen = now
+                return
+        if len(data) == BEACON_SIZE and data[:2] == BEACON_MAGIC:
+            msg = self._unpack_beacon(data)
+        else:
+            try:
+                msg = _loads(data)
+            except Exception:
+                return
         if not isinstance(msg, dict):
             return
         mtype = msg.get('type')
@@ -168,34 +372,59 @@ class Discovery(threading.Thread):
             inst = msg.get('instance_id')
             if not inst or inst == self.instance_id:
                 return
-            self.window.write_event_value('-LOG_EVENT-', f"[Discovery] BEACON from {addr} name={msg.get('name')} ws={msg.get('ws_port')}")
-            dev = Device(
-                instance_id=inst,
-                name=msg.get('name', 'Unknown'),
-                ip=msg.get('ip', addr),
-                ws_port=int(msg.get('ws_port', 8765)),
-                last_seen=time.time()
-            )
-            if self._devices.get(inst) != dev:
-                self._devices[inst] = dev
-                self.window.write_event_value('-DEVICES_CHANGED-', {k: vars(v) for k, v in self._devices.items()})
+            self._log(f"[Discovery] BEACON from {addr} name={msg.get('name')} ws={msg.get('ws_port')}")
+            name = msg.get('name', 'Unknown')
+            ip = msg.get('ip', addr)
+            ws_port = int(msg.get('ws_port', 8765))
+            self._beacon_seen[addr] = (digest, inst)
+            prev = self._devices.get(inst)
+            # Known and unchanged: only refresh last_seen, no new Device and no GUI update
+            if prev is not None and (prev.name, prev.ip, prev.ws_port) == (name, ip, ws_port):
+                prev.last_seen = time.monotonic()
+                return
+            now = time.monotonic()
+            self._devices[inst] = Device(instance_id=inst, name=name, ip=ip,
+                                         ws_port=ws_port, last_seen=now)
+            self._devices_dirty = True
+            if prev is None:
+                heapq.heappush(self._expiry, (now + self.device_ttl_s, inst))
+                if self._prune_timer is None:
+                    self._prune_timer = self._loop.call_later(PRUNE_INTERVAL_S, self._prune_tick)
 
         elif mtype == 'REQUEST_CONTROL':
             to = msg.get('to')
             if to and to != self.instance_id:
                 return
-            self.window.write_event_value('-LOG_EVENT-', f"[Discovery] REQUEST from {addr} name={msg.get('name')} to={msg.get('to')}")
+            self._log(f"[Discovery] REQUEST from {addr} name={msg.get('name')} to={msg.get('to')}")
             self.window.write_event_value('-REQUEST_RECEIVED-', (msg, addr))
         elif mtype == 'RESPONSE_CONTROL':
             self.window.write_event_value('-RESPONSE_RECEIVED-', (msg, addr))
 
+    @staticmethod
+    def _unpack_beacon(data: memoryview):
+        try:
+            _magic, version, inst, ip, ws_port, name = _BEACON.unpack(data)
+            if version != BEACON_VERSION:
+                return None
+            return {
+                'type': 'BEACON',
+                'instance_id': str(uuid.UUID(bytes=inst)),
+                'name': name.rstrip(b'\0').decode('utf-8', 'ignore'),
+                'ip': socket.inet_ntoa(ip),
+                'ws_port': ws_port,
+                'version': version,
+            }
+        except Exception:
+            return None
+
     def send_request(self, target_ip: str, options: dict, to: str | None = None):
         msg = {
             'type': 'REQUEST_CONTROL',
             'from': self.instance_id,
             'to': to,
             'name': self.name,
-            'ws_host': get_primary_ip(),
+            # Same address the beacons advertise; refreshed by the IP timer
+            'ws_host': self._ip,
             'ws_port': self.ws_port,
             'options': options,
         }
@@ -210,14 +439,75 @@ class Discovery(threading.Thread):
         self._send(msg, target_ip)
 
 
+class ClientThread(threading.Thread):
+    """Runs a KVMClient in-process on its own event loop instead of a child interpreter."""
+
+    def __init__(self, host: str, port: int, options: dict):
+        super().__init__(daemon=True)
+        # Imported on first use so the GUI starts without pyautogui/pynput; later
+        # connections reuse the already imported module
+        import client
+        self.client = client.KVMClient(
+            host, port,
+            map_mode=options.get('map', 'relative'),
+            interp_enabled=bool(options.get('interp', True)),
+            interp_rate_hz=int(options.get('interp_rate_hz', 240)),
+            interp_step_px=int(options.get('interp_step_px', 10)),
+            deadzone_px=int(options.get('deadzone_px', 1)),
+            speed=float(options.get('speed', 1.0)),
+            ping_timeout=float(options.get('ping_timeout', 10.0)),
+            realtime=bool(options.get('realtime', False)),
+        )
+        new_loop = client._new_event_loop or asyncio.new_event_loop
+        self._loop = new_loop()
+        self._task = None
+
+    def run(self):
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        self._task = loop.create_task(self.client.run())
+        try:
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            try:
+                # Child tasks of the client (smoother, screen and ping loops) would otherwise
+                # be destroyed while pending when the loop closes
+                tasks = asyncio.all_tasks(loop)
+                for task in tasks:
+                    task.cancel()
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+                self.client.close()
+
+    def stop(self):
+        # Cancelling the task unwinds connect_to_server(), which closes the websocket
+        try:
+            self._loop.call_soon_threadsafe(self._cancel)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def _cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
 class App:
     def __init__(self):
         self.instance_id = str(uuid.uuid4())
         self.name = socket.gethostname()
         self.ws_port = 8765
         self.server_proc = None
-        self.client_proc = None
+        self.client_thread = None
         self.discovery = None
+        self.devices: Dict[str, dict] = {}
+        # (lower-cased name, instance id) tuples, kept sorted incrementally with bisect,
+        # and the listbox labels in the same order
+        self._sorted: list[tuple[str, str]] = []
+        self._labels: list[str] = []
 
         sg.theme('DarkBlue')
 
@@ -238,11 +528,13 @@ class App:
             [sg.Text('Step (px):'), sg.Spin(list(range(1, 201)), initial_value=10, key='-STEP-')],
             [sg.Text('Deadzone (px):'), sg.Spin(list(range(0, 21)), initial_value=1, key='-DEADZONE-')],
             [sg.Text('Speed ×:'), sg.Spin([f'{i/10:.1f}' for i in range(1, 51)], initial_value='1.0', key='-SPEED-')],
+            [sg.Text('Ping timeout (s, 0 = off):'), sg.Spin(list(range(0, 61)), initial_value=10, key='-PING_TIMEOUT-')],
             [sg.Text('Hotkey:'), sg.Combo(['f13', 'f12', 'f11', 'f14'], default_value='f13', key='-HOTKEY-')],
             [sg.Checkbox('Interpolation', default=True, key='-INTERP-'),
              sg.Checkbox('Send Mouse', default=True, key='-TX_MOUSE-'),
              sg.Checkbox('Send Keyboard', default=True, key='-TX_KB-')],
-            [sg.Checkbox('Show Logs', default=False, key='-SHOW_LOGS-')]
+            [sg.Checkbox('Realtime priority', default=False, key='-REALTIME-'),
+             sg.Checkbox('Show Logs', default=False, key='-SHOW_LOGS-')]
         ]
 
         logs_layout = [[sg.Multiline('', size=(80, 10), key='-LOG-', autoscroll=True, disabled=False)]]
@@ -256,6 +548,7 @@ class App:
         ]
 
         self.window = sg.Window('KVM Control', layout, finalize=True)
+        self.window['-DEVICES-'].Values = self._labels
         self.pending_request = None
         self.discovery = Discovery(self.instance_id, self.name, self.ws_port, self.window)
         self.discovery.start()
@@ -267,17 +560,11 @@ class App:
     def _set_status(self, text: str):
         self.window['-STATUS-'].update(text)
 
-    def _get_script_path(self, name: str) -> str:
-        return os.path.join(os.path.dirname(__file__), name)
-
     def handle_event(self, event, values):
         if event == sg.WIN_CLOSED:
             return False
         elif event == '-DEVICES_CHANGED-':
-            devices = values[event]
-            items = [f"{info['name']}  {info['ip']}:{info['ws_port']}  [{inst[:8]}]" for inst, info in sorted(devices.items(), key=lambda kv: kv[1]['name'])]
-            self.devices_map = {item: (info['ip'], inst) for (inst, info), item in zip(sorted(devices.items(), key=lambda kv: kv[1]['name']), items)}
-            self.window['-DEVICES-'].update(items, set_to_index=0 if devices else None)
+            self._update_devices(self.discovery.take_devices())
         elif event == '-REQUEST_RECEIVED-':
             req, addr = values[event]
             name = req.get('name', addr)
@@ -295,19 +582,15 @@ class App:
                 self._set_status('Control denied')
 
         elif event == '-REQUEST-':
-            if not values['-DEVICES-']:
+            indexes = self.window['-DEVICES-'].get_indexes()
+            if not indexes or indexes[0] >= len(self._sorted):
                 self._set_status('Please select a device')
                 return True
-            selected_device_str = values['-DEVICES-'][0]
-            ip, inst = self.devices_map.get(selected_device_str, (None, None))
-            if not ip:
-                try:
-                    ip = selected_device_str.split('  ')[1].split(':')[0]
-                except Exception:
-                    self._set_status('Could not parse device info.')
-                    return True
+            inst = self._sorted[indexes[0]][1]
+            ip = self.devices[inst]['ip']
             self.window.write_event_value('-LOG_EVENT-', f'Requesting control from {ip}')
-            self.discovery.send_request(ip, self.current_options(values), to=None)
+            # Address the selected instance so other peers behind the same IP ignore it
+            self.discovery.send_request(ip, self.current_options(values), to=inst)
             self._set_status('Request sent - waiting for confirmation...' )
 
 
@@ -351,6 +634,40 @@ class App:
 
         return True
 
+    @staticmethod
+    def _device_label(inst: str, d: dict) -> str:
+        return f"{d['name']}  {d['ip']}:{d['ws_port']}  [{inst[:8]}]"
+
+    def _update_devices(self, devices: dict):
+        # Patch only the changed rows of the Tk listbox; _labels is shared with the
+        # element's Values so the selection still maps to the right labels.
+        lb = self.window['-DEVICES-'].Widget
+        for inst in [i for i in self.devices if i not in devices]:
+            idx = bisect.bisect_left(self._sorted, (self.devices.pop(inst)['name'].lower(), inst))
+            del self._sorted[idx], self._labels[idx]
+            lb.delete(idx)
+        for inst, info in devices.items():
+            old = self.devices.get(inst)
+            self.devices[inst] = info
+            if old is not None:
+                if (old['name'], old['ip'], old['ws_port']) == (info['name'], info['ip'], info['ws_port']):
+                    continue
+                idx = bisect.bisect_left(self._sorted, (old['name'].lower(), inst))
+                if old['name'] == info['name']:
+                    self._labels[idx] = self._device_label(inst, info)
+                    lb.delete(idx)
+                    lb.insert(idx, self._labels[idx])
+                    continue
+                del self._sorted[idx], self._labels[idx]
+                lb.delete(idx)
+            key = (info['name'].lower(), inst)
+            idx = bisect.bisect_left(self._sorted, key)
+            self._sorted.insert(idx, key)
+            self._labels.insert(idx, self._device_label(inst, info))
+            lb.insert(idx, self._labels[idx])
+        if self._labels and not lb.curselection():
+            lb.selection_set(0)
+
     def current_options(self, values) -> dict:
         return {
             'map': values['-MAP-'],
@@ -359,37 +676,37 @@ class App:
             'interp_step_px': int(values['-STEP-']),
             'deadzone_px': int(values['-DEADZONE-']),
             'speed': float(values['-SPEED-']),
+            'ping_timeout': float(values['-PING_TIMEOUT-']),
+            'realtime': values['-REALTIME-'],
         }
 
     def start_server(self):
         if self.server_proc and self.server_proc.poll() is None:
             return
-        args = [sys.executable, self._get_script_path('server.py'), '--host', '0.0.0.0', '--port', str(self.ws_port),
+        args = [sys.executable, _SERVER_PY, '--host', '0.0.0.0', '--port', str(self.ws_port),
                 '--hotkey', self.window['-HOTKEY-'].get(), '--start-capturing']
         if not self.window['-TX_MOUSE-'].get():
             args.append('--no-tx-mouse')
         if not self.window['-TX_KB-'].get():
             args.append('--no-tx-keyboard')
-        self.server_proc = subprocess.Popen(args)
+        self.server_proc = subprocess.Popen(args, **_POPEN_KW)
         self._set_status(f'Server started on port {self.ws_port}')
 
     def start_client(self, host: str, port: int, options: dict):
-        if self.client_proc and self.client_proc.poll() is None:
-            self.client_proc.kill()
-        args = [sys.executable, self._get_script_path('client.py'), host, '--port', str(port),
-                '--map', options.get('map', 'relative'),
-                '--interp-rate-hz', str(int(options.get('interp_rate_hz', 240))),
-                '--interp-step-px', str(int(options.get('interp_step_px', 10))),
-                '--deadzone-px', str(int(options.get('deadzone_px', 1))),
-                '--speed', str(float(options.get('speed', 1.0)))]
-        if options.get('interp', True):
-            args.insert(6, '--interp')
-        self.client_proc = subprocess.Popen(args)
+        self._stop_client()
+        self.client_thread = ClientThread(host, port, options)
+        self.client_thread.start()
+
+    def _stop_client(self) -> bool:
+        thread, self.client_thread = self.client_thread, None
+        if thread is None or not thread.is_alive():
+            return False
+        thread.stop()
+        thread.join(timeout=2.0)
+        return True
 
     def disconnect_client(self):
-        if self.client_proc and self.client_proc.poll() is None:
-            self.client_proc.kill()
-            self.client_proc = None
+        if self._stop_client():
             self._set_status('Client disconnected')
         else:
             self._set_status('No active client')
@@ -400,8 +717,7 @@ class App:
             self.discovery.join()
         if self.server_proc:
             self.server_proc.kill()
-        if self.client_proc:
-            self.client_proc.kill()
+        self._stop_client()
         self.window.close()
 
 
@@ -3,22 +3,106 @@
 KVM Server (Laptop A) - Fängt Tastatur/Maus Events ab und sendet sie über WebSocket
 """
 import asyncio
+import sys
 import websockets
 import json
 import threading
 import time
 import argparse
-import queue
+import struct
+from collections import deque
 from pynput import mouse, keyboard
 from pynput.mouse import Button
 import pyautogui
+# Optionales Binärformat für die Event-Frames (--wire msgpack)
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+# Optionaler libuv-Eventloop (nur POSIX, weniger Overhead pro Wakeup und Write)
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except Exception:
+    _new_event_loop = None
+# Optionaler C-JSON-Encoder; decode() hält die Frames als Text, den auch
+# Electron/Rust-Clients erwarten
+try:
+    import orjson
+
+    def _encode_json(message):
+        return orjson.dumps(message).decode()
+
+    # orjson ist für alle Events schneller als jede Vorlage
+    _encode_event_json = _encode_json
+except Exception:
+    def _encode_json(message):
+        return json.dumps(message, separators=(',', ':'))
+
+    # Ohne orjson: häufigstes Event als fertige Vorlage (~3x schneller als json.dumps);
+    # gleiche Felder und Reihenfolge wie in on_mouse_move, repr() eines endlichen
+    # floats ist gültiges JSON
+    _MOVE_JSON = ('{"type":"mouse_move","coord":"normalized","x":%r,"y":%r,'
+                  '"src_w":%d,"src_h":%d,"sync":false}')
+
+    def _encode_event_json(message):
+        """JSON-Frame; normalisierte Mausbewegungen ohne generischen Encoder"""
+        if message['type'] == 'mouse_move' and message.get('coord') == 'normalized':
+            return _MOVE_JSON % (message['x'], message['y'], message['src_w'], message['src_h'])
+        return _encode_json(message)
+
+
+# Binäre Move-Frames (--wire binary), müssen zu client.py passen; die Tag-Bytes
+# kollidieren nicht mit msgpack-Maps.
+# 'N': x/y normalisiert als 16-Bit-Festkomma (0..65535), src_w/src_h;
+# 'M': x/y in Pixeln (int16); 'S': eigene Bildschirmgröße (Handshake beim Verbinden
+# und bei Änderung); 'P': x/y in Pixeln dieses Bildschirms (uint16), vom Client über
+# die zuletzt empfangene 'S'-Größe normalisiert
+_MOVE_TAG = b'N'
+_MOVE_FRAME = struct.Struct('<cHHHH')
+_PIXEL_TAG = b'M'
+_PIXEL_FRAME = struct.Struct('<chh')
+_SCREEN_TAG = b'S'
+_SCREEN_FRAME = struct.Struct('<cHH')
+_SRC_TAG = b'P'
+_SRC_FRAME = struct.Struct('<cHH')
+
+# Ganzzahlige Tastencodes (--wire msgpack/binary), müssen zu _KEY_NAMES in client.py
+# passen: Sondertasten als ~Index in diese Liste, Zeichen als Codepoint.
+# Nur am Ende erweitern, sonst verschieben sich die Codes.
+_KEY_NAMES = (
+    'alt', 'alt_l', 'alt_r', 'alt_gr', 'backspace', 'caps_lock', 'cmd', 'cmd_l',
+    'cmd_r', 'ctrl', 'ctrl_l', 'ctrl_r', 'delete', 'down', 'end', 'enter', 'esc',
+    'home', 'left', 'page_down', 'page_up', 'right', 'shift', 'shift_l', 'shift_r',
+    'space', 'tab', 'up', 'insert', 'menu', 'num_lock', 'pause', 'print_screen',
+    'scroll_lock', 'media_play_pause', 'media_volume_mute', 'media_volume_down',
+    'media_volume_up', 'media_previous', 'media_next', 'f1', 'f2', 'f3', 'f4', 'f5',
+    'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12', 'f13', 'f14', 'f15', 'f16', 'f17',
+    'f18', 'f19', 'f20',
+)
+# Aliase im Key-Enum (z.B. alt_r is alt_gr unter Windows/macOS) behalten den ersten Index
+_KEY_CODES = {}
+for _i, _name in enumerate(_KEY_NAMES):
+    _key = getattr(keyboard.Key, _name, None)
+    if _key is not None and _key not in _KEY_CODES:
+        _KEY_CODES[_key] = ~_i
+del _i, _name, _key
+
+# Maximale Anzahl wartender Events zwischen Listener-Threads und Eventloop
+EVENT_QUEUE_MAX = 100
+# Maximale Anzahl Events pro Batch-Frame (--batch)
+BATCH_MAX = 32
+# Intervall, in dem die eigene Bildschirmgröße neu gelesen wird (Sekunden)
+SCREEN_REFRESH_S = 2.0
 
 class KVMServer:
     def __init__(self, host='0.0.0.0', port=8765,
                  transmit_mouse: bool = True,
                  transmit_keyboard: bool = True,
                  switch_hotkey: str = 'f13',
-                 auto_start_capturing: bool = False):
+                 auto_start_capturing: bool = False,
+                 wire: str = 'json',
+                 batch: bool = False):
         self.host = host
         self.port = port
         self.clients = set()
@@ -26,9 +110,14 @@ class KVMServer:
         self.mouse_listener = None
         self.keyboard_listener = None
         
-        # Event-Queue für Thread-sichere Kommunikation
-        self.event_queue = queue.Queue(maxsize=100)  # Begrenzte Queue-Größe
+        # Event-Queue zwischen Listener-Threads und Eventloop: deque.append ist
+        # thread-sicher, bei Überlauf fallen die ältesten Events heraus
+        self.event_queue = deque(maxlen=EVENT_QUEUE_MAX)
         self.loop = None
+        # Letzte noch nicht gesendete Mausposition (x, y); append/popleft sind atomar
+        self._move_slot = deque(maxlen=1)
+        self._wake = None            # asyncio.Event, in start_server angelegt
+        self._wake_scheduled = False  # höchstens ein call_soon_threadsafe pro Drain
         
         # Performance-Optimierungen
         self.last_mouse_time = 0.0  # nutzt perf_counter für präziseres Throttling
@@ -46,20 +135,74 @@ class KVMServer:
         
         # Hotkey für das Umschalten (konfigurierbar, Standard F13)
         self.switch_hotkey = self._parse_hotkey(switch_hotkey)
-        self.pressed_keys = set()
+        # Gedrückte Hotkey-Tasten als Bitmaske statt Set-Vergleich pro Tastendruck
+        self._hotkey_bits = {key: 1 << i for i, key in enumerate(self.switch_hotkey)}
+        self._hotkey_full = (1 << len(self._hotkey_bits)) - 1
+        self._hotkey_mask = 0
+        # Remote gedrückte, noch nicht losgelassene Tasten (Taste -> gesendete Daten)
+        self._sent_keys = {}
+
+        # Bildschirmgröße gecacht statt pyautogui.size() pro Mausbewegung
+        self._screen = None  # (sw, sh, 1/sw, 1/sh), als Ganzes getauscht
 
         # Welche Eingaben werden übertragen
         self.transmit_mouse = transmit_mouse
         self.transmit_keyboard = transmit_keyboard
+
+        # Wire-Format: JSON-Textframes (Standard, kompatibel), msgpack-Binärframes oder
+        # binary = feste Move-Frames + msgpack (bzw. JSON ohne msgpack) für den Rest
+        if wire == 'msgpack' and msgpack is None:
+            print("⚠️  msgpack nicht installiert, verwende JSON")
+            wire = 'json'
+        self.wire = wire
+        if wire == 'msgpack':
+            self._encode = msgpack.Packer(use_bin_type=True).pack
+        elif wire == 'binary':
+            self._encode_other = msgpack.Packer(use_bin_type=True).pack if msgpack else _encode_json
+            self._encode = self._encode_binary
+        else:
+            self._encode = _encode_event_json
+        # Mehrere gleichzeitig anstehende Events als ein {'type': 'batch'}-Frame senden
+        # (nur Python-Client; Electron/Rust erwarten ein Event pro Frame)
+        self.batch = batch
+        # Binäre Formate übertragen Tasten als Ganzzahl; JSON bleibt bei Strings,
+        # die auch die Electron/Rust-Clients verstehen
+        self._key_data = self._key_code if wire != 'json' else self._key_name
+        self._refresh_screen_size()
         
         print(f"KVM Server wird gestartet auf {self.host}:{self.port}")
         print("Hotkey zum Umschalten: " + (switch_hotkey.upper() if isinstance(switch_hotkey, str) else 'F13'))
         if self.host == '0.0.0.0':
             print("⚠️  Remote-Modus: Stellen Sie sicher, dass Port 8765 in der Firewall freigegeben ist")
     
+    def _encode_binary(self, message):
+        """Mausbewegungen als feste Binärframes, alles andere über den Fallback-Encoder"""
+        if message.get('type') == 'mouse_move':
+            if message.get('coord') == 'normalized':
+                screen = self._screen
+                if (screen is not None and message.get('src_w') == screen[0]
+                        and message.get('src_h') == screen[1]):
+                    # Größe ist dem Client per 'S' bekannt -> nur Pixel senden (5 Byte);
+                    # x/y sind bereits auf [0,1] begrenzt
+                    return _SRC_FRAME.pack(_SRC_TAG, int(message['x'] * screen[0] + 0.5),
+                                           int(message['y'] * screen[1] + 0.5))
+                # Clamp hier, damit der Client den Wert ungeprüft übernehmen kann
+                x, y = message['x'], message['y']
+                qx = 0 if not x > 0.0 else (65535 if x >= 1.0 else int(x * 65535 + 0.5))
+                qy = 0 if not y > 0.0 else (65535 if y >= 1.0 else int(y * 65535 + 0.5))
+                return _MOVE_FRAME.pack(_MOVE_TAG, qx, qy,
+                                        message.get('src_w') or 0, message.get('src_h') or 0)
+            x, y = int(message['x']), int(message['y'])
+            if -32768 <= x <= 32767 and -32768 <= y <= 32767:
+                return _PIXEL_FRAME.pack(_PIXEL_TAG, x, y)
+        return self._encode_other(message)
+
     async def register_client(self, websocket):
         """Neuen Client registrieren"""
         self.clients.add(websocket)
+        if self.wire == 'binary' and self._screen is not None:
+            # Synchron direkt nach dem Eintragen: kein Move-Frame kann davor landen
+            websockets.broadcast((websocket,), self._screen_frame())
         client_info = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
         print(f"Client verbunden: {client_info}")
         
@@ -69,109 +212,106 @@ class KVMServer:
             self.clients.remove(websocket)
             print(f"Client getrennt: {client_info}")
     
-    async def send_to_clients(self, message):
-        """Nachricht an alle verbundenen Clients senden (optimiert)"""
+    def send_to_clients(self, message):
+        """Nachricht an alle verbundenen Clients senden (nur im Capturing-Modus)"""
         if not (self.clients and self.capturing):
             return
-            
-        # JSON nur einmal serialisieren
-        json_message = json.dumps(message, separators=(',', ':'))
-        
-        # Parallel an alle Clients senden
-        tasks = []
-        for client in list(self.clients):
-            tasks.append(self._send_to_client(client, json_message))
-        
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Getrennte Clients entfernen
-            disconnected = set()
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    client = list(self.clients)[i] if i < len(self.clients) else None
-                    if client:
-                        disconnected.add(client)
-            
-            self.clients -= disconnected
+        self._broadcast(self._encode(message))
     
-    async def send_mouse_sync(self, message):
-        """Mausbewegung synchron an alle Clients senden (optimiert)"""
+    def send_mouse_sync(self, message):
+        """Nachricht unabhängig vom Capturing-Modus an alle Clients senden"""
         if not self.clients:
             return
-            
-        # JSON nur einmal serialisieren für alle Clients
-        json_message = json.dumps(message, separators=(',', ':'))  # Kompakte JSON-Ausgabe
-        
-        # Parallel an alle Clients senden
-        tasks = []
-        for client in list(self.clients):  # Kopie der Liste für Thread-Sicherheit
-            tasks.append(self._send_to_client(client, json_message))
-        
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Getrennte Clients entfernen
-            disconnected = set()
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    client = list(self.clients)[i] if i < len(self.clients) else None
-                    if client:
-                        disconnected.add(client)
-            
-            self.clients -= disconnected
+        self._broadcast(self._encode(message))
     
-    async def _send_to_client(self, client, json_message):
-        """Hilfsfunktion um Nachrichten an einzelne Clients zu senden"""
-        try:
-            await client.send(json_message)
-            return True
-        except websockets.exceptions.ConnectionClosed:
-            raise  # Exception wird von send_mouse_sync behandelt
-        except Exception as e:
-            raise e
+    def _broadcast(self, frame):
+        """Einmal serialisierten Frame an alle Clients schreiben, ohne auf langsame
+        Clients zu warten; geschlossene Verbindungen werden übersprungen und von
+        register_client entfernt"""
+        websockets.broadcast(self.clients, frame)
     
+    def _refresh_screen_size(self):
+        """Eigene Bildschirmgröße neu lesen (Start und periodisch im Eventloop)"""
+        try:
+            sw, sh = pyautogui.size()
+        except Exception:
+            sw = sh = 0
+        old = self._screen
+        if old is not None and (old[0], old[1]) == (sw, sh):
+            return
+        self._screen = (sw, sh, 1.0 / sw, 1.0 / sh) if sw and sh else None
+        if self._screen is not None and self.wire == 'binary' and self.clients:
+            self._broadcast(self._screen_frame())
+
+    def _screen_frame(self):
+        return _SCREEN_FRAME.pack(_SCREEN_TAG, self._screen[0], self._screen[1])
+
+    async def _screen_size_loop(self):
+        """Auflösungswechsel erkennen, ohne pyautogui.size() pro Event aufzurufen"""
+        while True:
+            await asyncio.sleep(SCREEN_REFRESH_S)
+            self._refresh_screen_size()
+
+    def _enqueue(self, message):
+        """Event aus einem Listener-Thread einreihen und den Eventloop wecken.
+        Eine offene Mausposition wird vorher eingereiht, damit kein Klick, Scroll oder
+        Tastendruck (auch aus dem Tastatur-Thread) die Bewegung davor überholt."""
+        self._flush_move()
+        self.event_queue.append(message)
+        self._wake_loop()
+
+    def _wake_loop(self):
+        # Nur der erste Event seit dem letzten Drain weckt den Loop (Self-Pipe-Write)
+        if not self._wake_scheduled and self.loop is not None:
+            self._wake_scheduled = True
+            try:
+                self.loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # Loop bereits geschlossen
+
     async def process_event_queue(self):
         """Verarbeitet Events aus der Queue in der Async-Loop"""
+        events = self.event_queue
         while True:
+            # Schlafen bis ein Listener-Thread etwas einreiht (kein Polling)
+            await self._wake.wait()
+            self._wake.clear()
+            # Vor dem Leeren zurücksetzen: später eingereihte Events wecken erneut
+            self._wake_scheduled = False
             try:
-                # Mehrere Events auf einmal verarbeiten für bessere Performance
-                events_to_process = []
-                
-                # Sammle alle verfügbaren Events (bis zu 25 auf einmal)
-                for _ in range(25):
-                    try:
-                        message = self.event_queue.get_nowait()
-                        events_to_process.append(message)
-                    except queue.Empty:
-                        break
-                
-                if events_to_process:
-                    # Mausbewegungen zusammenfassen: nur die letzte Position senden
-                    last_mouse_move = None
-                    others = []
-                    for message in events_to_process:
-                        if message.get('type') == 'mouse_move':
-                            last_mouse_move = message
-                        else:
-                            others.append(message)
-
-                    tasks = []
-                    for message in others:
-                        if message.get('sync', False):
-                            tasks.append(self.send_mouse_sync(message))
-                        else:
-                            tasks.append(self.send_to_clients(message))
-                    if last_mouse_move is not None:
-                        tasks.append(self.send_to_clients(last_mouse_move))
-
-                    # Alle Tasks parallel ausführen
-                    if tasks:
-                        await asyncio.gather(*tasks, return_exceptions=True)
-                else:
-                    # Keine Events, minimale Pause
-                    await asyncio.sleep(0.00005)  # 0.05ms
-                    
+                # Aufeinanderfolgende Mausbewegungen zusammenfassen: nur die letzte
+                # Position eines Laufs senden. Ein Move vor einem Klick bleibt in
+                # Reihenfolge erhalten, damit der Klick an der richtigen Stelle landet.
+                drained = []
+                while True:
+                    if events:
+                        message = events.popleft()
+                    else:
+                        # Die neueste Mausposition ist jünger als alle eingereihten Events
+                        try:
+                            message = self._move_message(*self._move_slot.popleft())
+                        except IndexError:
+                            break
+                    if (drained and message['type'] == 'mouse_move'
+                            and drained[-1]['type'] == 'mouse_move'):
+                        drained[-1] = message
+                    else:
+                        drained.append(message)
+
+                if self.batch:
+                    # Ein Frame pro Drain statt eines pro Event (Reihenfolge bleibt)
+                    batch = [m for m in drained if not m.get('sync', False)]
+                    drained = [m for m in drained if m.get('sync', False)]
+                    if len(batch) == 1:
+                        self.send_to_clients(batch[0])
+                    else:
+                        for i in range(0, len(batch), BATCH_MAX):
+                            self.send_to_clients({'type': 'batch', 'events': batch[i:i + BATCH_MAX]})
+                for message in drained:
+                    if message.get('sync', False):
+                        self.send_mouse_sync(message)
+                    else:
+                        self.send_to_clients(message)
             except Exception as e:
                 print(f"Fehler beim Verarbeiten des Events: {e}")
     
@@ -187,39 +327,13 @@ class KVMServer:
         if now - self.last_mouse_time < self.mouse_throttle:
             return
         self.last_mouse_time = now
-        current_time = time.time()
         
         # Nur im Remote-Capturing senden (ein Gerät aktiv)
         if self.clients and self.capturing:  # Nur senden wenn Clients verbunden und Capturing aktiv ist
-            # Koordinaten normalisieren, damit Client-Bildschirmgröße voll genutzt wird
-            try:
-                sw, sh = pyautogui.size()
-                x_norm = max(0.0, min(1.0, x / sw)) if sw else 0.0
-                y_norm = max(0.0, min(1.0, y / sh)) if sh else 0.0
-            except Exception:
-                # Fallback: falls Größe nicht ermittelbar ist, sende Rohdaten
-                x_norm, y_norm = None, None
-                sw, sh = None, None
-
-            message = {
-                'type': 'mouse_move',
-                'coord': 'normalized' if x_norm is not None else 'absolute',
-                'x': x_norm if x_norm is not None else x,
-                'y': y_norm if y_norm is not None else y,
-                'timestamp': current_time,
-                'src_w': sw,
-                'src_h': sh,
-                'sync': False
-            }
-            try:
-                self.event_queue.put_nowait(message)
-            except queue.Full:
-                # Queue voll, älteste Events verwerfen
-                try:
-                    self.event_queue.get_nowait()  # Ältestes Event entfernen
-                    self.event_queue.put_nowait(message)  # Neues Event hinzufügen
-                except queue.Empty:
-                    pass
+            # Nur die neueste Position zählt: Slot überschreiben statt ein dict pro
+            # Event einzureihen; der Eventloop baut daraus beim Drain die Nachricht
+            self._move_slot.append((x, y))
+            self._wake_loop()
             # Falls Suppression nicht aktiv ist, Cursor an fester Position halten
             if self.capturing and self.lock_cursor_when_remote and not self.suppress_mouse and self._cursor_locked_pos:
                 try:
@@ -233,6 +347,35 @@ class KVMServer:
                     # minimale Verzögerung vermeiden; Flag sofort zurücksetzen
                     self._is_warping_cursor = False
     
+    def _move_message(self, x, y):
+        """mouse_move-Nachricht aus Pixelkoordinaten bauen"""
+        # Koordinaten normalisieren, damit Client-Bildschirmgröße voll genutzt wird
+        screen = self._screen
+        if screen is None:
+            # Fallback: falls Größe nicht ermittelbar ist, sende Rohdaten
+            return {'type': 'mouse_move', 'coord': 'absolute', 'x': x, 'y': y,
+                    'src_w': None, 'src_h': None, 'sync': False}
+        sw, sh, inv_w, inv_h = screen
+        x_norm = x * inv_w
+        y_norm = y * inv_h
+        return {
+            'type': 'mouse_move',
+            'coord': 'normalized',
+            'x': 0.0 if x_norm < 0.0 else (1.0 if x_norm > 1.0 else x_norm),
+            'y': 0.0 if y_norm < 0.0 else (1.0 if y_norm > 1.0 else y_norm),
+            'src_w': sw,
+            'src_h': sh,
+            'sync': False
+        }
+
+    def _flush_move(self):
+        """Offene Mausposition in die Queue übernehmen (popleft ist threadsicher)"""
+        try:
+            x, y = self._move_slot.popleft()
+        except IndexError:
+            return
+        self.event_queue.append(self._move_message(x, y))
+
     def on_mouse_click(self, x, y, button, pressed):
         """Maus-Klick abfangen"""
         if self.capturing and self.transmit_mouse:
@@ -242,13 +385,9 @@ class KVMServer:
                 'y': y,
                 'button': button.name,
                 'pressed': pressed,
-                'timestamp': time.time(),
                 'sync': False  # Nur im Capturing-Modus
             }
-            try:
-                self.event_queue.put_nowait(message)
-            except queue.Full:
-                pass
+            self._enqueue(message)
     
     def on_mouse_scroll(self, x, y, dx, dy):
         """Maus-Scroll abfangen"""
@@ -259,64 +398,61 @@ class KVMServer:
                 'y': y,
                 'dx': dx,
                 'dy': dy,
-                'timestamp': time.time(),
                 'sync': False  # Nur im Capturing-Modus
             }
-            try:
-                self.event_queue.put_nowait(message)
-            except queue.Full:
-                pass
+            self._enqueue(message)
     
     def on_key_press(self, key):
         """Tastendruck abfangen"""
-        self.pressed_keys.add(key)
-        
         # Prüfen ob Hotkey gedrückt wurde
-        if self.switch_hotkey.issubset(self.pressed_keys):
-            self.toggle_capturing()
-            return
+        bit = self._hotkey_bits.get(key)
+        if bit is not None:
+            self._hotkey_mask |= bit
+            if self._hotkey_mask == self._hotkey_full:
+                self.toggle_capturing()
+                return
         
         if self.capturing and self.transmit_keyboard:
-            try:
-                key_data = key.char if hasattr(key, 'char') and key.char else str(key)
-            except AttributeError:
-                key_data = str(key)
-            
+            data = self._sent_keys[key] = self._key_data(key)
             message = {
                 'type': 'key_press',
-                'key': key_data,
-                'timestamp': time.time(),
+                'key': data,
                 'sync': False  # Nur im Capturing-Modus
             }
-            try:
-                self.event_queue.put_nowait(message)
-            except queue.Full:
-                pass
+            self._enqueue(message)
     
     def on_key_release(self, key):
         """Taste loslassen abfangen"""
-        try:
-            self.pressed_keys.discard(key)
-        except KeyError:
-            pass
+        bit = self._hotkey_bits.get(key)
+        if bit is not None:
+            self._hotkey_mask &= ~bit
         
         if self.capturing and self.transmit_keyboard:
-            try:
-                key_data = key.char if hasattr(key, 'char') and key.char else str(key)
-            except AttributeError:
-                key_data = str(key)
-            
+            self._sent_keys.pop(key, None)
             message = {
                 'type': 'key_release',
-                'key': key_data,
-                'timestamp': time.time(),
+                'key': self._key_data(key),
                 'sync': False  # Nur im Capturing-Modus
             }
-            try:
-                self.event_queue.put_nowait(message)
-            except queue.Full:
-                pass
+            self._enqueue(message)
     
+    @staticmethod
+    def _key_name(key):
+        """Taste als String: Zeichen oder 'Key.xyz'"""
+        try:
+            return key.char if hasattr(key, 'char') and key.char else str(key)
+        except AttributeError:
+            return str(key)
+
+    @staticmethod
+    def _key_code(key):
+        """Taste als Ganzzahl (siehe _KEY_NAMES); nicht abbildbare Tasten als String"""
+        char = getattr(key, 'char', None)
+        if char:
+            return ord(char) if len(char) == 1 else char
+        code = _KEY_CODES.get(key)
+        return code if code is not None else str(key)
+
     def toggle_capturing(self):
         """Umschalten zwischen lokalem und Remote-Modus.
         - Wenn aktiv: Maus/Klicks/Tastatur werden remote gesendet und lokale Maus wird unterbunden.
@@ -344,6 +480,13 @@ class KVMServer:
         else:
             self._cursor_locked_pos = None
 
+        # Beim Zurückschalten noch gehaltene Tasten remote loslassen, sonst bleiben sie
+        # am Ziel gedrückt (das key_release kommt ja nicht mehr an)
+        if not self.capturing:
+            for data in self._sent_keys.values():
+                self._enqueue({'type': 'key_release', 'key': data, 'sync': True})
+            self._sent_keys.clear()
+
         if self.capturing:
             print("➡️  Remote aktiv: Sende Maus/Tastatur/Klicks an Client. Lokale Maus unterbunden.")
         else:
@@ -438,6 +581,7 @@ class KVMServer:
     
     async def start_server(self):
         """WebSocket-Server starten"""
+        self._wake = asyncio.Event()
         self.loop = asyncio.get_running_loop()
         self.start_listeners()
         # Optional: Capturing automatisch aktivieren
@@ -445,20 +589,23 @@ class KVMServer:
             # Unterdrückung entsprechend Flags setzen
             self.toggle_capturing()
         
+        event_task = screen_task = None
         try:
             # Wrapper-Funktion für bessere Kompatibilität
             async def handler(websocket, path=None):
                 await self.register_client(websocket)
             
-            # Event-Processing-Task starten
+            # Event-Processing- und Bildschirmgrößen-Task starten
             event_task = asyncio.create_task(self.process_event_queue())
+            screen_task = asyncio.create_task(self._screen_size_loop())
             
             async with websockets.serve(
                 handler,
                 self.host,
                 self.port,
                 compression=None,  # geringere Latenz (nicht komprimieren)
-                max_queue=1        # kleine Warteschlange zur Latenzreduktion
+                max_queue=1,       # kleine Warteschlange zur Latenzreduktion
+                max_size=2**16     # Clients senden selbst keine Events
             ):
                 print(f"Server läuft auf ws://{self.host}:{self.port}")
                 print("Warten auf Client-Verbindungen...")
@@ -467,6 +614,11 @@ class KVMServer:
             print("\nServer wird beendet...")
         finally:
             self.stop_listeners()
+            # Hintergrund-Tasks beenden, statt sie beim Schließen des Loops hängen zu lassen
+            tasks = [task for task in (event_task, screen_task) if task is not None]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def _parse_hotkey(self, key_name: str):
         """Erzeuge ein Set von Tasten für den Umschalt-Hotkey. Unterstützt einfache Funktions-Tasten."""
@@ -480,6 +632,19 @@ class KVMServer:
         key = mapping.get(key_name, keyboard.Key.f13)
         return {key}
 
+def _run(coro):
+    """Coroutine auf uvloop ausführen, falls installiert, sonst auf dem Standard-Loop"""
+    if _new_event_loop is None:
+        asyncio.run(coro)
+    elif sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=_new_event_loop) as runner:
+            runner.run(coro)
+    else:
+        # asyncio.Runner gibt es erst ab 3.11
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(coro)
+
+
 def main():
     parser = argparse.ArgumentParser(description='KVM Server - Remote Tastatur/Maus Steuerung')
     parser.add_argument('--host', default='0.0.0.0', 
@@ -504,6 +669,12 @@ def main():
                         help='Tastatur-Ereignisse nicht übertragen')
     parser.add_argument('--start-capturing', action='store_true',
                         help='Beim Start Remote-Capturing automatisch aktivieren')
+    parser.add_argument('--wire', choices=['json', 'msgpack', 'binary'], default='json',
+                        help='Frame-Format: json=Text (Standard), msgpack=binär (benötigt msgpack), '
+                             'binary=feste Move-Frames + msgpack/JSON')
+    parser.add_argument('--batch', action='store_true',
+                        help='Gleichzeitig anstehende Events in einem Frame bündeln '
+                             '(nur mit dem Python-Client kompatibel)')
     
     args = parser.parse_args()
     
@@ -511,7 +682,9 @@ def main():
                        transmit_mouse=args.tx_mouse,
                        transmit_keyboard=args.tx_keyboard,
                        switch_hotkey=args.hotkey,
-                       auto_start_capturing=args.start_capturing)
+                       auto_start_capturing=args.start_capturing,
+                       wire=args.wire,
+                       batch=args.batch)
     if args.no_suppress_mouse:
         server.suppress_mouse = False
     if args.no_suppress_keyboard:
@@ -527,7 +700,7 @@ def main():
         print("🏠 Lokaler Zugriff - Server nur lokal erreichbar")
     
     try:
-        asyncio.run(server.start_server())
+        _run(server.start_server())
     except KeyboardInterrupt:
         print("\nProgramm beendet.")
 